@@ -0,0 +1,33 @@
+from django.db import models
+
+
+# Translatable fields counts covered by benchmarks, a model is defined for
+# each one (see translations.py)
+FIELD_COUNTS = (1, 3, 6)
+
+
+class Bench1(models.Model):
+    slug = models.SlugField()
+    f0 = models.CharField(max_length=150)
+
+
+class Bench3(models.Model):
+    slug = models.SlugField()
+    f0 = models.CharField(max_length=150)
+    f1 = models.CharField(max_length=150)
+    f2 = models.CharField(max_length=150)
+
+
+class Bench6(models.Model):
+    slug = models.SlugField()
+    f0 = models.CharField(max_length=150)
+    f1 = models.CharField(max_length=150)
+    f2 = models.CharField(max_length=150)
+    f3 = models.CharField(max_length=150)
+    f4 = models.CharField(max_length=150)
+    f5 = models.CharField(max_length=150)
+
+
+def get_model(field_count):
+    """ Returns benchmark model with `field_count` translatable fields """
+    return {1: Bench1, 3: Bench3, 6: Bench6}[field_count]
@@ -0,0 +1,8 @@
+from model_i18n import translator
+
+from benchapp.models import FIELD_COUNTS, get_model
+
+
+for count in FIELD_COUNTS:
+    translator.register(get_model(count),
+                        fields=tuple(['f%d' % i for i in range(count)]))
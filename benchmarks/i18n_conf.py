@@ -0,0 +1,3 @@
+from model_i18n import loaders
+
+loaders.autodiscover()
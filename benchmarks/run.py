@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""
+Translation query path benchmarks.
+
+Times TransQuerySet iteration against a plain QuerySet for several row
+counts, number of languages requested with get_translations and number of
+translatable fields, and separately times SQL construction (TransJoin and
+QOuterJoins), row fetch, change_fields and switch_language.
+
+Runs on SQLite (in memory) and on a local PostgreSQL database if available
+(see settings.py for connection environment variables). Results are written
+as JSON so they can be compared between releases:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --backends sqlite3 --rows 100,1000 --languages 1,8
+"""
+import os
+import sys
+import time
+import platform
+import subprocess
+import tempfile
+from optparse import OptionParser
+from os.path import abspath, dirname
+
+BENCH_DIR = dirname(abspath(__file__))
+DEFAULT_BACKENDS = 'sqlite3,postgresql_psycopg2'
+
+
+def measure(func, setup=None, repeat=5):
+    """ Runs `func` `repeat` times and returns timings in seconds, `setup`
+    result (if given) is passed to `func` and isn't timed """
+    timings = []
+    for i in range(repeat):
+        args = setup and (setup(),) or ()
+        start = time.time()
+        func(*args)
+        timings.append(time.time() - start)
+    timings.sort()
+    return {'best': timings[0],
+            'median': timings[len(timings) // 2],
+            'mean': sum(timings) / len(timings),
+            'repeat': repeat}
+
+
+def populate(model, rows, languages):
+    """ Replaces `model` rows with `rows` new ones, translated to every
+    language in `languages` """
+    from django.db import connection, transaction
+
+    qn = connection.ops.quote_name
+    trans_model = model._translation_model
+    trans_opts = trans_model._transmeta
+    fields = list(trans_opts.translatable_fields)
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM %s' % qn(trans_model._meta.db_table))
+    cursor.execute('DELETE FROM %s' % qn(model._meta.db_table))
+
+    columns = ['id', 'slug'] + fields
+    cursor.executemany('INSERT INTO %s (%s) VALUES (%s)' % (
+                            qn(model._meta.db_table),
+                            ', '.join([qn(c) for c in columns]),
+                            ', '.join(['%s'] * len(columns))),
+                       [[pk, 'slug-%d' % pk] + ['%s %d' % (f, pk) for f in fields]
+                            for pk in range(1, rows + 1)])
+
+    master_fk = trans_model._meta.get_field(trans_opts.master_field_name).column
+    columns = [master_fk, trans_opts.language_field_name] + fields
+    cursor.executemany('INSERT INTO %s (%s) VALUES (%s)' % (
+                            qn(trans_model._meta.db_table),
+                            ', '.join([qn(c) for c in columns]),
+                            ', '.join(['%s'] * len(columns))),
+                       [[pk, lang] + ['%s %s %d' % (f, lang, pk) for f in fields]
+                            for pk in range(1, rows + 1) for lang in languages])
+    transaction.commit_unless_managed()
+
+
+def compile_sql(qs):
+    """ Returns (sql, params) for `qs` """
+    from model_i18n.conf import MULTIDB_SUPPORT
+    if MULTIDB_SUPPORT:
+        return qs.query.get_compiler(qs.db).as_sql()
+    return qs.query.as_sql()
+
+
+def run_case(model, languages, repeat):
+    """ Runs every benchmark for `model` with `languages` requested,
+    returns a {benchmark name: timings} dict """
+    from django.db import connection
+    from django.db.models.query import QuerySet
+
+    implicit = languages[0]
+    translated = lambda loading='join': model.objects.set_loading(loading)\
+                                             .get_translations(list(languages),
+                                                               implicit)
+    results = {}
+
+    results['plain_iteration'] = measure(lambda: list(QuerySet(model)),
+                                         repeat=repeat)
+    results['join_iteration'] = measure(lambda: list(translated()),
+                                        repeat=repeat)
+    results['prefetch_iteration'] = measure(lambda: list(translated('prefetch')),
+                                            repeat=repeat)
+
+    # SQL construction: TransJoin/QOuterJoins setup plus query compilation
+    results['sql_construction'] = measure(lambda: compile_sql(translated()),
+                                          repeat=repeat)
+
+    # Row fetch: joined query without model instances
+    sql, params = compile_sql(translated())
+    def fetch():
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    results['row_fetch'] = measure(fetch, repeat=repeat)
+
+    # change_fields on instances built by django (joined values still on
+    # positional attributes)
+    qs = translated()
+    current = qs.joined + sorted(qs.languages.difference(qs.joined))
+    raw = lambda: list(QuerySet.iterator(qs))
+    results['change_fields'] = measure(lambda objs: [qs.change_fields(obj, current)
+                                                        for obj in objs],
+                                       setup=raw, repeat=repeat)
+
+    # switch_language through every loaded language and back to master
+    def switch(objs):
+        for lang in current + [None]:
+            for obj in objs:
+                obj.switch_language(lang)
+    results['switch_language'] = measure(switch, setup=lambda: list(qs),
+                                         repeat=repeat)
+    return results
+
+
+def run(options):
+    """ Runs benchmarks on current backend, returns results list """
+    from django.conf import settings
+    from django.core.management import call_command
+
+    call_command('syncdb', interactive=False, verbosity=0)
+    import model_i18n
+    from benchapp.models import get_model
+
+    master = settings.MODEL_I18N_MASTER_LANGUAGE
+    codes = [code for code, name in settings.LANGUAGES if code != master]
+    languages_counts = [int(n) for n in options.languages.split(',')]
+    results = []
+    for field_count in [int(n) for n in options.fields.split(',')]:
+        model = get_model(field_count)
+        for rows in [int(n) for n in options.rows.split(',')]:
+            populate(model, rows, codes[:max(languages_counts)])
+            for languages_count in languages_counts:
+                languages = codes[:languages_count]
+                case = run_case(model, languages, options.repeat)
+                for name, timings in sorted(case.items()):
+                    timings.update({'benchmark': name,
+                                    'backend': settings.DATABASE_ENGINE,
+                                    'rows': rows,
+                                    'languages': languages_count,
+                                    'fields': field_count})
+                    results.append(timings)
+                    if options.verbose:
+                        sys.stderr.write('%(backend)s %(benchmark)s rows=%(rows)d '
+                                         'languages=%(languages)d fields=%(fields)d: '
+                                         '%(best).6fs\n' % timings)
+    return results
+
+
+def main():
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('--backends', default=DEFAULT_BACKENDS,
+                      help='Comma separated database backends '
+                           '(default: %s)' % DEFAULT_BACKENDS)
+    parser.add_option('--rows', default='100,1000',
+                      help='Comma separated master row counts')
+    parser.add_option('--languages', default='1,4,8',
+                      help='Comma separated requested languages counts')
+    parser.add_option('--fields', default='1,3,6',
+                      help='Comma separated translatable fields counts')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='Times each benchmark is run')
+    parser.add_option('--output', default=None,
+                      help='JSON results file, printed if not given')
+    parser.add_option('-v', '--verbose', action='store_true', default=False)
+    options, args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'settings'
+    sys.path[:0] = [BENCH_DIR, dirname(BENCH_DIR)]
+    backends = options.backends.split(',')
+    if len(backends) == 1:
+        os.environ['BENCH_BACKEND'] = backends[0]
+        results = run(options)
+    else:
+        # Each backend runs on its own process (settings are per process),
+        # unavailable backends are skipped
+        from django.utils import simplejson
+        results = []
+        for backend in backends:
+            fd, path = tempfile.mkstemp(suffix='.json')
+            os.close(fd)
+            argv = [sys.executable, abspath(__file__), '--backends', backend,
+                    '--output', path] + strip_options(sys.argv[1:],
+                                                      ('--backends', '--output'))
+            if subprocess.call(argv) == 0:
+                results.extend(simplejson.load(open(path))['results'])
+            else:
+                sys.stderr.write('Skipping %s backend\n' % backend)
+            os.remove(path)
+
+    write_results(results, options.output)
+
+
+def strip_options(argv, names):
+    """ Removes `names` options (and their values) from `argv` """
+    stripped, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in names:
+            skip = True
+        elif arg.split('=')[0] not in names:
+            stripped.append(arg)
+    return stripped
+
+
+def write_results(results, output=None):
+    """ Writes `results` plus environment metadata as JSON """
+    import django
+    from django.utils import simplejson
+    from model_i18n import get_version
+
+    data = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'model_i18n': get_version(),
+            'results': results}
+    content = simplejson.dumps(data, indent=2, sort_keys=True)
+    if output:
+        open(output, 'w').write(content)
+    else:
+        print content
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Benchmarks settings. SQLite (in memory) is used by default, set
+# BENCH_BACKEND=postgresql_psycopg2 (plus BENCH_DB_NAME, BENCH_DB_USER,
+# BENCH_DB_PASSWORD and BENCH_DB_HOST if needed) to run on PostgreSQL.
+# BENCH_DEBUG=1 and BENCH_DEFERRED_SETUP=1 enable DEBUG and
+# MODEL_I18N_DEFERRED_SETUP (used by startup.py).
+from os import environ
+from os.path import abspath, dirname, join
+import sys
+
+LANGUAGES = (
+  ('en', 'English'),
+  ('es', 'Español'),
+  ('fr', 'Français'),
+  ('de', 'Deutsch'),
+  ('it', 'Italiano'),
+  ('pt', 'Português'),
+  ('nl', 'Nederlands'),
+  ('sv', 'Svenska'),
+  ('pl', 'Polski'),
+)
+LANGUAGE_CODE = 'en'
+
+### model_i18n settings ###
+MODEL_I18N_CONF = 'i18n_conf'
+MODEL_I18N_MASTER_LANGUAGE = LANGUAGE_CODE
+
+BENCH_DIR = dirname(abspath(__file__))
+sys.path.append(BENCH_DIR)
+sys.path.append(join(BENCH_DIR, '..'))
+
+INSTALLED_APPS = (
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.admin',
+    'model_i18n',
+    'benchapp',
+)
+
+SECRET_KEY = 'model_i18n-benchmarks'
+
+DATABASE_ENGINE = environ.get('BENCH_BACKEND', 'sqlite3')
+if DATABASE_ENGINE == 'sqlite3':
+    DATABASE_NAME = ':memory:'
+else:
+    DATABASE_NAME = environ.get('BENCH_DB_NAME', 'model_i18n_bench')
+    DATABASE_USER = environ.get('BENCH_DB_USER', '')
+    DATABASE_PASSWORD = environ.get('BENCH_DB_PASSWORD', '')
+    DATABASE_HOST = environ.get('BENCH_DB_HOST', '')
+
+DEBUG = environ.get('BENCH_DEBUG') == '1'
+MODEL_I18N_DEFERRED_SETUP = environ.get('BENCH_DEFERRED_SETUP') == '1'
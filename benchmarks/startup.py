@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Startup time benchmarks.
+
+Each sample is a fresh process which imports the django modules used by
+model_i18n first, then times:
+
+    * import: importing model_i18n (configuration module, translations
+      autodiscover and models registration)
+    * setup_deferred: registration steps deferred by
+      MODEL_I18N_DEFERRED_SETUP (nothing to do if disabled)
+    * first_query: building the SQL of a first translated query
+
+for every DEBUG / MODEL_I18N_DEFERRED_SETUP combination:
+
+    python benchmarks/startup.py --samples 20 --output startup.json
+"""
+import os
+import sys
+import time
+import subprocess
+from optparse import OptionParser
+from os.path import abspath, dirname
+
+BENCH_DIR = dirname(abspath(__file__))
+
+
+def child():
+    """ Times startup steps on current process, prints them as JSON """
+    sys.path[:0] = [BENCH_DIR, dirname(BENCH_DIR)]
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'settings'
+    from django.conf import settings
+    from django.utils import simplejson
+    # framework modules imported by model_i18n aren't timed
+    from django.db import models
+    from django.contrib import admin
+
+    timings = {}
+    start = time.time()
+    import model_i18n
+    timings['import'] = time.time() - start
+
+    from model_i18n.translator import setup_deferred
+    start = time.time()
+    setup_deferred()
+    timings['setup_deferred'] = time.time() - start
+
+    from benchapp.models import get_model
+    start = time.time()
+    str(get_model(6).objects.set_language('es').query)
+    timings['first_query'] = time.time() - start
+    print simplejson.dumps(timings)
+
+
+def main():
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('--samples', type='int', default=10,
+                      help='Processes started for each configuration')
+    parser.add_option('--output', default=None,
+                      help='JSON results file, printed if not given')
+    parser.add_option('--child', action='store_true', default=False,
+                      help= 'Time current process startup (internal)')
+    options, args = parser.parse_args()
+    if options.child:
+        return child()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'settings'
+    sys.path[:0] = [BENCH_DIR, dirname(BENCH_DIR)]
+    from django.utils import simplejson
+    from run import write_results
+
+    results = []
+    for debug in ('0', '1'):
+        for deferred in ('0', '1'):
+            env = dict(os.environ, BENCH_DEBUG=debug,
+                       BENCH_DEFERRED_SETUP=deferred)
+            samples = {}
+            for i in range(options.samples):
+                process = subprocess.Popen([sys.executable, abspath(__file__),
+                                            '--child'],
+                                           stdout=subprocess.PIPE, env=env)
+                output = process.communicate()[0]
+                if process.returncode:
+                    raise SystemExit('Startup sample failed')
+                for name, value in simplejson.loads(output).iteritems():
+                    samples.setdefault(name, []).append(value)
+            for name, timings in sorted(samples.items()):
+                timings.sort()
+                results.append({'benchmark': name,
+                                'debug': debug == '1',
+                                'deferred_setup': deferred == '1',
+                                'best': timings[0],
+                                'median': timings[len(timings) // 2],
+                                'mean': sum(timings) / len(timings),
+                                'repeat': len(timings)})
+    write_results(results, options.output)
+
+
+if __name__ == '__main__':
+    main()
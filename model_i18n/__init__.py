@@ -1,5 +1,3 @@
-import inspect
-
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
@@ -22,16 +20,18 @@ def get_version():
     return version
 
 
+# Set once configuration module loading starts
+_conf_loaded = False
+
 def _load_conf(*args, **kwargs):
     """  Ensures the configuration module gets imported when importing model_i18n. """
-    # This is an idea from haystack app. We need to run the code that
-    # follows only once, no matter how many times the main module is imported.
-    # We'll look through the stack to see if we appear anywhere and simply
-    # return if we do, allowing the original call to finish.
-    stack = inspect.stack()
-    for stack_info in stack[1:]:
-        if '_load_conf' in stack_info[3]:
-            return
+    # We need to run the code that follows only once, no matter how many
+    # times the main module is imported. The configuration module may import
+    # model_i18n again, the flag is set before importing it so nested calls
+    # just return, allowing the original call to finish.
+    global _conf_loaded
+    if _conf_loaded:
+        return
 
     if not hasattr(settings, 'MODEL_I18N_CONF'):
         raise ImproperlyConfigured('You must define the MODEL_I18N_CONF setting, it should be a python module path string, for example "myproject.i18n_conf"')
@@ -39,6 +39,11 @@ def _load_conf(*args, **kwargs):
         raise ImproperlyConfigured('You must define the MODEL_I18N_MASTER_LANGUAGE setting.')
 
     # Import config module
-    import_module(settings.MODEL_I18N_CONF)
+    _conf_loaded = True
+    try:
+        import_module(settings.MODEL_I18N_CONF)
+    except:
+        _conf_loaded = False
+        raise
 
 _load_conf()
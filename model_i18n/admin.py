@@ -1,10 +1,13 @@
+import warnings
+
 from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.defaults import patterns, url
 from django.db import transaction
 from django.http import Http404, HttpResponseRedirect
 from django.core.exceptions import PermissionDenied
-from django.forms.models import modelform_factory
+from django.forms import BaseForm
+from django.forms.models import modelform_factory, fields_for_model
 from django.views.decorators.csrf import csrf_protect
 from django.shortcuts import render_to_response
 from django.template import RequestContext
@@ -16,7 +19,12 @@ from django.utils.decorators import method_decorator
 
 from model_i18n.exceptions import OptionWarning
 from model_i18n.utils import get_translation_opt
-from model_i18n.conf import CHANGE_TPL, CHANGE_TRANSLATION_TPL
+from model_i18n.conf import CHANGE_TPL, CHANGE_TRANSLATION_TPL, \
+                            TRANSLATED_LANGUAGES, JSON_STORAGE
+from model_i18n.stats import timed
+from model_i18n.bulk import bulk_upsert
+from model_i18n.query import fetch_translations
+from model_i18n.managers import without_default_language
 
 
 def setup_admin(master_model, translation_model):
@@ -40,9 +48,75 @@ def setup_admin(master_model, translation_model):
 
     # setup admin methods, etc
     model_admin.change_form_template = CHANGE_TPL
-    model_admin.__class__.get_urls_orig = model_admin.__class__.get_urls
-    model_admin.__class__.get_urls = get_urls
+    # urls are patched on the instance, admin classes (ModelAdmin itself
+    # for models registered without one) are shared by other models
+    model_admin.get_urls_orig = model_admin.get_urls
+    model_admin.get_urls = lambda: get_urls(model_admin)
     model_admin.__class__.i18n_change_view = i18n_change_view
+    model_admin.__class__.i18n_translations_view = i18n_translations_view
+    # admin edits master values
+    model_admin.queryset = without_default_language(model_admin.queryset)
+
+    if translation_model._transmeta.admin_languages_column:
+        setup_languages_column(model_admin)
+
+
+def setup_languages_column(model_admin):
+    """Adds the translated languages column to `model_admin` changelist,
+    changelist results get their languages loaded (see
+    set_translated_languages)"""
+    model_admin.list_display = tuple(model_admin.list_display) + \
+                               (translated_languages,)
+    get_changelist = model_admin.get_changelist
+    model_admin.get_changelist = lambda request, **kwargs: \
+            languages_changelist(get_changelist(request, **kwargs))
+
+
+def languages_changelist(ChangeList):
+    """Returns a `ChangeList` subclass which loads translated languages
+    of the listed objects with a single query per page"""
+    class LanguagesChangeList(ChangeList):
+        def get_results(self, request):
+            super(LanguagesChangeList, self).get_results(request)
+            set_translated_languages(self.model, self.result_list)
+    return LanguagesChangeList
+
+
+def set_translated_languages(model, instances):
+    """Sets translated languages codes of each instance in `instances`,
+    loaded with a single query"""
+    trans_opts = model._translation_model._transmeta
+    master_field = trans_opts.master_field_name
+    lang_field = trans_opts.language_field_name
+    instances = list(instances)
+    languages = {}
+    if instances and trans_opts.storage == JSON_STORAGE:
+        rows = fetch_translations(model, [obj.pk for obj in instances],
+                                  [code for code, name in settings.LANGUAGES
+                                        if code != trans_opts.master_language])
+    elif instances:
+        rows = model._translation_model._default_manager.filter(**{
+                    '%s__in' % master_field: [obj.pk for obj in instances]
+               }).values_list(master_field, lang_field)
+    if instances:
+        for pk, language in rows:
+            languages.setdefault(pk, set()).add(language)
+    for obj in instances:
+        obj.__dict__[TRANSLATED_LANGUAGES] = languages.get(obj.pk, set())
+
+
+def translated_languages(obj):
+    """Changelist column, translated languages codes followed by the
+    missing ones (struck through)"""
+    translated = obj.__dict__.get(TRANSLATED_LANGUAGES, ())
+    master_language = get_translation_opt(obj, 'master_language')
+    codes = [code for code, name in settings.LANGUAGES
+                if code != master_language]
+    return ' '.join([code for code in codes if code in translated] +
+                    ['<del>%s</del>' % code for code in codes
+                        if code not in translated])
+translated_languages.short_description = _('translated languages')
+translated_languages.allow_tags = True
 
 
 def get_urls(instance):
@@ -52,17 +126,16 @@ def get_urls(instance):
     # original urls
     urls = instance.get_urls_orig()
     return urls[:-1] + patterns('', 
+                url(r'^(?P<obj_id>\d+)/translations/$',
+                    instance.i18n_translations_view),
                 url(r'^(?P<obj_id>\d+)/(?P<language>[a-z]{2})/$',
                     instance.i18n_change_view),
                 urls[-1])
 
 
-@method_decorator(csrf_protect)
-@transaction.commit_on_success
-def i18n_change_view(instance, request, obj_id, language):
-    """Change view for i18n values for current instance. This is a
-    simplified django-admin change view which displays i18n fields
-    for current model/id."""
+def get_translated_object(instance, request, obj_id):
+    """Returns the object edited by i18n views, checking change
+    permission"""
     opts = instance.model._meta
     obj = instance.get_object(request, obj_id)
 
@@ -73,6 +146,63 @@ def i18n_change_view(instance, request, obj_id, language):
         msg = _('%(name)s object with primary key %(key)r does not exist.')
         raise Http404(msg % {'name': force_unicode(opts.verbose_name),
                              'key': escape(obj_id)})
+    return obj
+
+
+def json_translation_forms(obj, fields, languages, request, prefix=True):
+    """Returns a form for each one of `languages` editing `obj` translations
+    on json storage, plain forms with master model fields holding stored
+    values as initial ones (loaded with a single query). Forms are
+    prefixed with their language if `prefix` is True, then forms of missing
+    translations can be left empty (like formsets extra forms)."""
+    Form = type('TranslationForm', (BaseForm,),
+                {'base_fields': fields_for_model(obj.__class__, fields)})
+    values = fetch_translations(obj.__class__, [obj.pk], languages)
+    result = []
+    for code in languages:
+        value = values.get((obj.pk, code))
+        kwargs = {'initial': value and dict(zip(fields, value[1:])) or {},
+                  'prefix': prefix and code or None,
+                  'empty_permitted': prefix and value is None}
+        if request.method == 'POST':
+            kwargs.update(data=request.POST, files=request.FILES)
+        result.append(Form(**kwargs))
+    return result
+
+
+class TranslationsAdminForm(object):
+    """AdminForm look alike for a list of (language name, form) tuples,
+    each form is displayed as a fieldset named after its language so the
+    change form template renders them as a single form."""
+    prepopulated_fields = ()
+
+    def __init__(self, forms, fields):
+        self.adminforms = [admin.helpers.AdminForm(form,
+                                                   [(name, {'fields': fields})],
+                                                   {}, None)
+                                for name, form in forms]
+        # non field errors are shown for the first form with errors
+        self.form = forms[0][1]
+        for name, form in forms:
+            if form.errors:
+                self.form = form
+                break
+
+    def __iter__(self):
+        for adminform in self.adminforms:
+            for fieldset in adminform:
+                yield fieldset
+
+
+@timed('change_view')
+@method_decorator(csrf_protect)
+@transaction.commit_on_success
+def i18n_change_view(instance, request, obj_id, language):
+    """Change view for i18n values for current instance. This is a
+    simplified django-admin change view which displays i18n fields
+    for current model/id."""
+    opts = instance.model._meta
+    obj = get_translated_object(instance, request, obj_id)
 
     if language not in dict(settings.LANGUAGES):
         raise Http404(_('Incorrect language %(lang)s') % {'lang': language})
@@ -86,22 +216,29 @@ def i18n_change_view(instance, request, obj_id, language):
     lang_field = get_translation_opt(obj, 'language_field_name')
     master_field = get_translation_opt(obj, 'master_field_name')
 
-    try:
-        trans = obj.translations.get(**{lang_field: language})
-    except obj._translation_model.DoesNotExist: # new translation
-        trans = obj._translation_model(**{lang_field: language,
-                                          master_field: obj})
-
-    ModelForm = modelform_factory(obj._translation_model, fields=fields)
-
-    if request.method == 'POST':
-        form = ModelForm(instance=trans, data=request.POST,
-                         files=request.FILES)
-        if form.is_valid():
-            form.save()
+    if get_translation_opt(obj, 'storage') == JSON_STORAGE:
+        form = json_translation_forms(obj, fields, [language], request,
+                                      prefix=False)[0]
+        if request.method == 'POST' and form.is_valid():
+            bulk_upsert(instance.model, [(obj.pk, language, form.cleaned_data)])
             return HttpResponseRedirect(request.path)
     else:
-        form = ModelForm(instance=trans)
+        try:
+            trans = obj.translations.get(**{lang_field: language})
+        except obj._translation_model.DoesNotExist: # new translation
+            trans = obj._translation_model(**{lang_field: language,
+                                              master_field: obj})
+
+        ModelForm = modelform_factory(obj._translation_model, fields=fields)
+
+        if request.method == 'POST':
+            form = ModelForm(instance=trans, data=request.POST,
+                             files=request.FILES)
+            if form.is_valid():
+                form.save()
+                return HttpResponseRedirect(request.path)
+        else:
+            form = ModelForm(instance=trans)
 
     adminform = admin.helpers.AdminForm(form, [(None, {'fields': fields})],
                                         {}, None)
@@ -125,3 +262,84 @@ def i18n_change_view(instance, request, obj_id, language):
     ctx = RequestContext(request, current_app=instance.admin_site.name)
     return render_to_response(CHANGE_TRANSLATION_TPL, context,
                               context_instance=ctx)
+
+
+@timed('change_view')
+@method_decorator(csrf_protect)
+@transaction.commit_on_success
+def i18n_translations_view(instance, request, obj_id):
+    """Change view for i18n values on every language at once. Translations
+    are loaded with a single query and shown as a form per language, just
+    the changed languages (and fields) are saved, in bulk. Forms of missing
+    translations are just validated if changed."""
+    opts = instance.model._meta
+    obj = get_translated_object(instance, request, obj_id)
+
+    master_language = get_translation_opt(obj, 'master_language')
+    languages = [(code, name) for code, name in settings.LANGUAGES
+                    if code != master_language]
+    if not languages:
+        return HttpResponseRedirect('../')
+
+    fields = get_translation_opt(obj, 'translatable_fields')
+    lang_field = get_translation_opt(obj, 'language_field_name')
+    master_field = get_translation_opt(obj, 'master_field_name')
+
+    if get_translation_opt(obj, 'storage') == JSON_STORAGE:
+        codes = [code for code, name in languages]
+        forms = [(code, name, form) for (code, name), form in
+                    zip(languages, json_translation_forms(obj, fields, codes,
+                                                          request))]
+    else:
+        translations = dict((getattr(trans, lang_field), trans)
+                                for trans in obj.translations.all())
+        ModelForm = modelform_factory(obj._translation_model, fields=fields)
+        forms = []
+        for code, name in languages:
+            trans = translations.get(code) or \
+                    obj._translation_model(**{lang_field: code,
+                                              master_field: obj})
+            empty_permitted = code not in translations
+            if request.method == 'POST':
+                form = ModelForm(instance=trans, prefix=code,
+                                 data=request.POST, files=request.FILES,
+                                 empty_permitted=empty_permitted)
+            else:
+                form = ModelForm(instance=trans, prefix=code,
+                                 empty_permitted=empty_permitted)
+            forms.append((code, name, form))
+
+    if request.method == 'POST' and \
+       not [form for code, name, form in forms if not form.is_valid()]:
+        bulk_upsert(instance.model,
+                    [(obj.pk, code, dict((field, form.cleaned_data[field])
+                                            for field in form.changed_data))
+                        for code, name, form in forms if form.has_changed()])
+        return HttpResponseRedirect(request.path)
+
+    errors = admin.helpers.AdminErrorList(forms[0][2], [])
+    for code, name, form in forms[1:]:
+        errors.extend(admin.helpers.AdminErrorList(form, []))
+
+    context = {
+        'title': _('Translations %s') % force_unicode(opts.verbose_name),
+        'adminform': TranslationsAdminForm([(name, form)
+                                                for code, name, form in forms],
+                                           fields),
+        'original': obj,
+        'is_popup': request.REQUEST.has_key('_popup'),
+        'errors': errors,
+        'root_path': instance.admin_site.root_path,
+        'app_label': opts.app_label, 'trans': True, 'all_languages': True,
+        'current_language': _('All languages'),
+        # override some values to provide an useful template
+        'add': False, 'change': True,
+        'has_change_permission_orig': True, # backup
+        'has_add_permission': False, 'has_change_permission': False,
+        'has_delete_permission': False, # hide delete link for now
+        'has_file_field': True, 'save_as': False, 'opts': instance.model._meta,
+    }
+
+    ctx = RequestContext(request, current_app=instance.admin_site.name)
+    return render_to_response(CHANGE_TRANSLATION_TPL, context,
+                              context_instance=ctx)
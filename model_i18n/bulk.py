@@ -0,0 +1,274 @@
+"""
+Bulk translations writes.
+
+Translations are read from an iterable of (master pk, language, values)
+tuples, where values is a {field name: value} dict, and written by chunks:
+existing translations are loaded with a single query per chunk, new ones
+are added with multi-row INSERT statements and the existing ones updated
+with multi-row UPDATE statements. Each chunk is written in a transaction.
+
+With json storage the translation row of each master instance is loaded,
+merged with the chunk values and written back the same way.
+"""
+import warnings
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.core.exceptions import FieldError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import simplejson
+
+from model_i18n.conf import MULTIDB_SUPPORT, BULK_CHUNK_SIZE, JSON_STORAGE, \
+                            JSON_DATA_FIELD_NAME
+from model_i18n.cache import translation_cache
+from model_i18n.bundles import translation_bundles
+from model_i18n.exceptions import OptionWarning
+from model_i18n.indexes import get_not_null_fields
+
+
+QN = connection.ops.quote_name # quote name
+
+# Parameters limit per statement (SQLite default SQLITE_MAX_VARIABLE_NUMBER),
+# multi-row statements are split to stay under it
+MAX_QUERY_PARAMS = 999
+
+
+def prep_value(field, value):
+    """ Returns `value` prepared for database by `field` """
+    if MULTIDB_SUPPORT:
+        return field.get_db_prep_save(value, connection=connection)
+    return field.get_db_prep_save(value)
+
+
+def not_null_default(field):
+    """ Returns `field` default value for a NOT NULL column, translatable
+    fields are nullable so get_default() returns None for them """
+    if field.has_default():
+        return field.get_default()
+    if field.empty_strings_allowed:
+        return ''
+    return None
+
+
+def split(items, width):
+    """ Splits `items` in lists of rows with `width` parameters each one
+    which fit in a single statement """
+    size = max(1, MAX_QUERY_PARAMS // width)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def validate_chunk(trans_model, chunk):
+    """ Checks fields and languages used on `chunk` rows, once per chunk.
+    Returns a {(pk, language): values} dict, values for repeated (pk,
+    language) pairs are merged (last value wins) """
+    trans_opts = trans_model._transmeta
+    to_python = trans_model._meta.get_field(trans_opts.master_field_name)\
+                           .rel.get_related_field().to_python
+    values = {}
+    for pk, lang, fields in chunk:
+        values.setdefault((to_python(pk), lang), {}).update(fields)
+
+    names = set()
+    for fields in values.itervalues():
+        names.update(fields)
+    unknown = names.difference(trans_opts.translatable_fields)
+    if unknown:
+        raise FieldError('Non translatable fields on %s translations: %s'
+                         % (trans_model._meta.object_name,
+                            ', '.join(sorted(unknown))))
+
+    languages = set([lang for pk, lang in values])
+    invalid = languages.difference([code for code, name in settings.LANGUAGES
+                                        if code != trans_opts.master_language])
+    if invalid:
+        raise ValueError('Invalid translation languages: %s'
+                         % ', '.join(sorted(invalid)))
+    return values
+
+
+def insert_translations(trans_model, values, not_null=()):
+    """ Adds new translations for {(pk, language): values} `values`, missing
+    fields are left null (not translated), or take their default value if
+    their column is on `not_null` column names """
+    trans_opts = trans_model._transmeta
+    get_field = trans_model._meta.get_field
+    fields = [get_field(name) for name in trans_opts.translatable_fields]
+    columns = [get_field(trans_opts.master_field_name).column,
+               get_field(trans_opts.language_field_name).column] + \
+              [field.column for field in fields]
+    missing = dict([(field.name, None) for field in fields])
+    missing.update([(field.name, not_null_default(field)) for field in fields
+                        if field.column in not_null])
+    rows = [[pk, lang] + [prep_value(field, row.get(field.name,
+                                                    missing[field.name]))
+                            for field in fields]
+                for (pk, lang), row in sorted(values.iteritems())]
+    insert_rows(trans_model, columns, rows)
+
+
+def insert_rows(trans_model, columns, rows):
+    """ Inserts `rows` (lists of prepared `columns` values) with multi-row
+    INSERT statements """
+    cursor = connection.cursor()
+    placeholder = '(%s)' % ', '.join(['%s'] * len(columns))
+    for rows in split(rows, len(columns)):
+        params = []
+        for row in rows:
+            params.extend(row)
+        cursor.execute('INSERT INTO %s (%s) VALUES %s' % (
+                            QN(trans_model._meta.db_table),
+                            ', '.join([QN(column) for column in columns]),
+                            ', '.join([placeholder] * len(rows))),
+                       params)
+
+
+def update_translations(trans_model, values, names=None):
+    """ Updates existing translations, `values` is a {translation pk:
+    values} dict. Just fields on values are updated, using a CASE
+    expression for each field of `names` (translatable_fields by
+    default) """
+    get_field = trans_model._meta.get_field
+    pk_column = QN(trans_model._meta.pk.column)
+    names = names or trans_model._transmeta.translatable_fields
+    cursor = connection.cursor()
+    for rows in split(sorted(values.items()), 2 * len(names) + 1):
+        assignments, params = [], []
+        for name in names:
+            field = get_field(name)
+            cases = [(pk, prep_value(field, row[name]))
+                        for pk, row in rows if name in row]
+            if not cases:
+                continue
+            assignments.append('%s = CASE %s %s ELSE %s END' % (
+                                    QN(field.column), pk_column,
+                                    ' '.join(['WHEN %s THEN %s'] * len(cases)),
+                                    QN(field.column)))
+            for case in cases:
+                params.extend(case)
+        if assignments:
+            pks = [pk for pk, row in rows]
+            cursor.execute('UPDATE %s SET %s WHERE %s IN (%s)' % (
+                                QN(trans_model._meta.db_table),
+                                ', '.join(assignments), pk_column,
+                                ', '.join(['%s'] * len(pks))),
+                           params + pks)
+
+
+def upsert_json(trans_model, values):
+    """ Writes {(pk, language): values} `values` on json storage, returns
+    (created, updated) translations counts. Missing fields of new
+    translations are left out (not translated). """
+    trans_opts = trans_model._transmeta
+    master = trans_opts.master_field_name
+    master_fk = trans_model._meta.get_field(master)
+    existing = trans_model._default_manager.filter(**{
+                    '%s__in' % master: list(set([pk for pk, _ in values]))
+               }).values_list(master, 'pk', JSON_DATA_FIELD_NAME)
+    existing = dict((pk, (trans_pk, simplejson.loads(data or '{}')))
+                        for pk, trans_pk, data in existing)
+
+    data, created = {}, 0
+    for (pk, lang), row in sorted(values.iteritems()):
+        if pk not in data:
+            data[pk] = existing.get(pk, (None, {}))[1]
+        if lang not in data[pk]:
+            created += 1
+        data[pk].setdefault(lang, {}).update(row)
+
+    data_field = trans_model._meta.get_field(JSON_DATA_FIELD_NAME)
+    encode = lambda value: simplejson.dumps(value, sort_keys=True,
+                                            cls=DjangoJSONEncoder)
+    insert_rows(trans_model, [master_fk.column, data_field.column],
+                [[pk, prep_value(data_field, encode(value))]
+                    for pk, value in sorted(data.iteritems())
+                        if pk not in existing])
+    update_translations(trans_model,
+                        dict((existing[pk][0],
+                              {JSON_DATA_FIELD_NAME: encode(value)})
+                                for pk, value in data.iteritems()
+                                    if pk in existing),
+                        [JSON_DATA_FIELD_NAME])
+    return created, len(values) - created
+
+
+def upsert_chunk(trans_model, chunk, not_null=()):
+    """ Writes `chunk` translations, returns (created, updated) counts,
+    `not_null` are the NOT NULL translated column names """
+    trans_opts = trans_model._transmeta
+    values = validate_chunk(trans_model, chunk)
+    if trans_opts.storage == JSON_STORAGE:
+        created, updated = upsert_json(trans_model, values)
+        clear_cached(trans_model, values)
+        return created, updated
+    master = trans_opts.master_field_name
+    lang = trans_opts.language_field_name
+    existing = trans_model._default_manager.filter(**{
+                    '%s__in' % master: list(set([pk for pk, _ in values])),
+                    '%s__in' % lang: list(set([code for _, code in values]))
+               }).values_list(master, lang, 'pk')
+    existing = dict(((pk, code), trans_pk) for pk, code, trans_pk in existing
+                        if (pk, code) in values)
+
+    insert_translations(trans_model, dict((key, row)
+                                            for key, row in values.iteritems()
+                                                if key not in existing),
+                        not_null)
+    update_translations(trans_model, dict((existing[key], row)
+                                            for key, row in values.iteritems()
+                                                if key in existing))
+    clear_cached(trans_model, values)
+    return len(values) - len(existing), len(existing)
+upsert_chunk = transaction.commit_on_success(upsert_chunk)
+
+
+def clear_cached(trans_model, values):
+    """ Drops cached translations and bundles of written `values` """
+    trans_opts = trans_model._transmeta
+    if trans_opts.cache:
+        for pk, code in values:
+            translation_cache.delete(trans_model, pk, code)
+    if trans_opts.bundle:
+        translation_bundles.bump(trans_model)
+
+
+def check_not_null(model):
+    """ Returns `model` translated column names which are NOT NULL on
+    database (see get_not_null_fields), warning about them """
+    try:
+        fields = get_not_null_fields(model)
+    except NotImplementedError: # assume tables created by syncdb
+        return ()
+    if fields:
+        warnings.warn(OptionWarning('%s translated columns %s are NOT NULL, '
+                                    'missing values are written with their '
+                                    'default value, see i18n_indexes command'
+                                    % (model._translation_model._meta.db_table,
+                                       ', '.join([field.column
+                                                    for field in fields]))))
+    return frozenset([field.column for field in fields])
+
+
+def bulk_upsert(model, rows, chunk_size=None):
+    """ Inserts or updates `model` translations from `rows`, an iterable of
+    (master pk, language, {field name: value}) tuples. Rows are consumed by
+    chunks of `chunk_size` (MODEL_I18N_BULK_CHUNK_SIZE setting by default)
+    so `rows` can be a generator. Returns (created, updated) counts.
+
+    Fields missing on new translations are left null (not translated),
+    tables created with NOT NULL translated columns get their default
+    value instead, with a warning (see i18n_indexes command). """
+    trans_model = model._translation_model
+    not_null = check_not_null(model)
+    rows = iter(rows)
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    created = updated = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunk_created, chunk_updated = upsert_chunk(trans_model, chunk,
+                                                    not_null)
+        created += chunk_created
+        updated += chunk_updated
+    return created, updated
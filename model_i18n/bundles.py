@@ -0,0 +1,153 @@
+"""
+Per-language translation bundles.
+
+Models registered with the bundle option keep every translation of a
+language in a single {master pk: value} mapping (values are tuples in the
+form (translation pk, field value, ...) following translatable_fields
+order, as in the translation cache). Bundles are stored in the translation
+cache backend and kept in process memory for MODEL_I18N_BUNDLE_MEMORY_TTL
+seconds, querysets load translations from them instead of the database.
+
+Each translation model has a version number on the cache backend, bumped
+when its instances are saved or deleted (or written in bulk). Bundles are
+stored under their version, processes check it once their memory copy
+expires and reload the bundle if it changed. Bundles are built on first
+use or by the i18n_warm_bundles command.
+"""
+import time
+from threading import Lock
+
+from django.db.models import signals
+
+from model_i18n.conf import BUNDLE_TIMEOUT, BUNDLE_MEMORY_TTL, STATS, \
+                            JSON_STORAGE, JSON_DATA_FIELD_NAME
+from model_i18n.cache import translation_cache
+from model_i18n.stats import incr
+
+
+class TranslationBundles(object):
+    """ Translation bundles, shared through `translation_cache` backend """
+    def __init__(self, timeout=BUNDLE_TIMEOUT, memory_ttl=BUNDLE_MEMORY_TTL):
+        self.timeout = timeout
+        self.memory_ttl = memory_ttl
+        self._lock = Lock()
+        # (translation model, language) -> (version, expiration, bundle)
+        self._memory = {}
+
+    @property
+    def cache(self):
+        return translation_cache.cache
+
+    def make_key(self, trans_model, suffix):
+        """ Cache key for `trans_model` bundles data """
+        opts = trans_model._meta
+        return '%s:bundle:%s.%s:%s' % (translation_cache.key_prefix,
+                                       opts.app_label,
+                                       opts.object_name.lower(), suffix)
+
+    def get_version(self, trans_model):
+        """ Returns `trans_model` bundles current version """
+        key = self.make_key(trans_model, 'version')
+        version = self.cache.get(key)
+        if version is None:
+            version = int(time.time())
+            self.cache.add(key, version, self.timeout)
+            version = self.cache.get(key) or version
+        return version
+
+    def bump(self, trans_model):
+        """ Sets a new `trans_model` bundles version, every process reloads
+        them once its memory copy expires (this one does right away) """
+        key = self.make_key(trans_model, 'version')
+        try:
+            self.cache.incr(key)
+        except ValueError: # missing version
+            self.cache.set(key, int(time.time()), self.timeout)
+        self._lock.acquire()
+        try:
+            for cached in self._memory.keys():
+                if cached[0] is trans_model:
+                    del self._memory[cached]
+        finally:
+            self._lock.release()
+
+    def build(self, trans_model, language):
+        """ Loads `language` bundle from the database """
+        trans_opts = trans_model._transmeta
+        if STATS:
+            incr('bundle_loads')
+        if trans_opts.storage == JSON_STORAGE:
+            from model_i18n.query import decode_translations
+            master_fk = trans_model._meta.get_field(trans_opts.master_field_name)
+            rows = trans_model._default_manager.values_list(
+                        trans_opts.master_field_name, 'pk', JSON_DATA_FIELD_NAME)
+            values = decode_translations(master_fk.rel.to, rows, [language])
+            return dict((pk, value) for (pk, lang), value in values.iteritems())
+        rows = trans_model._default_manager.filter(**{
+                    trans_opts.language_field_name: language
+               }).values_list(trans_opts.master_field_name, 'pk',
+                              *trans_opts.translatable_fields)
+        return dict((row[0], row[1:]) for row in rows)
+
+    def warm(self, trans_model, language):
+        """ Builds and stores `language` bundle, returns it """
+        version = self.get_version(trans_model)
+        bundle = self.build(trans_model, language)
+        self.cache.set(self.make_key(trans_model, '%s:%s' % (language, version)),
+                       bundle, self.timeout)
+        self.remember(trans_model, language, version, bundle)
+        return bundle
+
+    def remember(self, trans_model, language, version, bundle):
+        """ Keeps `bundle` in process memory """
+        self._lock.acquire()
+        try:
+            self._memory[(trans_model, language)] = \
+                    (version, time.time() + self.memory_ttl, bundle)
+        finally:
+            self._lock.release()
+
+    def get(self, trans_model, language):
+        """ Returns `language` bundle, from process memory if not expired,
+        from the cache backend or the database otherwise """
+        cached = self._memory.get((trans_model, language))
+        if cached is not None and cached[1] > time.time():
+            return cached[2]
+        version = self.get_version(trans_model)
+        if cached is not None and cached[0] == version: # still valid
+            self.remember(trans_model, language, version, cached[2])
+            return cached[2]
+        bundle = self.cache.get(self.make_key(trans_model,
+                                              '%s:%s' % (language, version)))
+        if bundle is None:
+            return self.warm(trans_model, language)
+        self.remember(trans_model, language, version, bundle)
+        return bundle
+
+    def get_many(self, trans_model, pks, languages):
+        """ Returns a {(pk, language): value} dict with `pks` translations
+        to `languages` """
+        values = {}
+        for lang in languages:
+            bundle = self.get(trans_model, lang)
+            for pk in pks:
+                if pk in bundle:
+                    values[(pk, lang)] = bundle[pk]
+        return values
+
+    def invalidate(self, sender, **kwargs):
+        """ post_save/post_delete handler for translation models """
+        self.bump(sender)
+
+    def connect(self, trans_model):
+        """ Bump bundles version when trans_model instances change """
+        uid = 'model_i18n.bundles.%s.%s' % (trans_model._meta.app_label,
+                                            trans_model.__name__)
+        signals.post_save.connect(self.invalidate, sender=trans_model,
+                                  dispatch_uid=uid)
+        signals.post_delete.connect(self.invalidate, sender=trans_model,
+                                    dispatch_uid=uid)
+
+
+# Just one bundles instance is needed.
+translation_bundles = TranslationBundles()
@@ -0,0 +1,89 @@
+"""
+Shared translation cache.
+
+Translated values are cached per (translation model, master pk, language)
+so querysets on models registered with the cache option can skip the
+translation table join. Entries are dropped when the translation model
+instances are saved or deleted.
+"""
+from django.conf import settings
+from django.core.cache import get_cache
+from django.db.models import signals
+
+from model_i18n.conf import CACHE_BACKEND, CACHE_TIMEOUT, CACHE_KEY_PREFIX, \
+                            JSON_STORAGE
+
+
+# Value cached for (master, language) pairs without translation, this way
+# untranslated rows don't go back to the database on every request
+NOT_TRANSLATED = 0
+
+
+class TranslationCache(object):
+    """ Translated values cache. Values are stored as tuples in the form
+    (translation pk, field value, ...) following translatable_fields order
+    """
+    def __init__(self, backend=CACHE_BACKEND, timeout=CACHE_TIMEOUT,
+                 key_prefix=CACHE_KEY_PREFIX):
+        self.backend = backend
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self._cache = None
+
+    @property
+    def cache(self):
+        """ Django cache instance, built on first access """
+        if self._cache is None:
+            self._cache = get_cache(self.backend)
+        return self._cache
+
+    def make_key(self, trans_model, pk, language):
+        """ Cache key for (translation model, master pk, language) """
+        opts = trans_model._meta
+        return '%s:%s.%s:%s:%s' % (self.key_prefix, opts.app_label,
+                                   opts.object_name.lower(), pk, language)
+
+    def get_many(self, trans_model, pks, languages):
+        """ Returns a {(pk, language): value} dict with the cached values
+        found for every pk and language combination """
+        keys = dict((self.make_key(trans_model, pk, lang), (pk, lang))
+                        for pk in pks for lang in languages)
+        found = self.cache.get_many(keys.keys())
+        return dict((keys[key], value) for key, value in found.iteritems())
+
+    def set_many(self, trans_model, values):
+        """ Stores a {(pk, language): value} dict """
+        for (pk, lang), value in values.iteritems():
+            self.cache.set(self.make_key(trans_model, pk, lang), value,
+                           self.timeout)
+
+    def delete(self, trans_model, pk, language):
+        """ Drops cached value for (pk, language) """
+        self.cache.delete(self.make_key(trans_model, pk, language))
+
+    def invalidate(self, sender, instance, **kwargs):
+        """ post_save/post_delete handler for translation models, every
+        language is dropped with json storage """
+        trans_opts = sender._transmeta
+        master_fk = sender._meta.get_field(trans_opts.master_field_name)
+        pk = getattr(instance, master_fk.attname)
+        if trans_opts.storage == JSON_STORAGE:
+            for lang, name in settings.LANGUAGES:
+                if lang != trans_opts.master_language:
+                    self.delete(sender, pk, lang)
+        else:
+            self.delete(sender, pk,
+                        getattr(instance, trans_opts.language_field_name))
+
+    def connect(self, trans_model):
+        """ Invalidate cached values when trans_model instances change """
+        uid = 'model_i18n.cache.%s.%s' % (trans_model._meta.app_label,
+                                          trans_model.__name__)
+        signals.post_save.connect(self.invalidate, sender=trans_model,
+                                  dispatch_uid=uid)
+        signals.post_delete.connect(self.invalidate, sender=trans_model,
+                                    dispatch_uid=uid)
+
+
+# Just one cache instance is needed.
+translation_cache = TranslationCache()
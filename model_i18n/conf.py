@@ -11,6 +11,10 @@ DEFAULT_MASTER_FIELD_NAME = getattr(settings, 'MODEL_I18N_MASTER_FIELD_NAME', '_
 # Translation table suffix used when building the table name from master model
 # db_table
 TRANSLATION_TABLE_SUFFIX = 'translation'
+# Same for translation tables of models with json storage, and the name of
+# their field holding every language values
+JSON_TABLE_SUFFIX = 'translation_json'
+JSON_DATA_FIELD_NAME = '_data'
 
 # Master attributes are stored in backups attributes in the form
 # <attribute name>_<suffix>, ATTR_BACKUP_SUFFIX allows to define suffix used,
@@ -24,6 +28,28 @@ RELATED_NAME = 'translations'
 CURRENT_LANGUAGES = 'current_languages'
 # Current selected language
 CURRENT_LANGUAGE  = 'current_language'
+# Translated field lookups language prefix, as in
+# filter(title__lang_es__icontains=...) or order_by('title__lang_es')
+LANGUAGE_LOOKUP_PREFIX = 'lang_'
+# Loaded translations store, used on models registered with lazy_fields
+TRANSLATION_VALUES = '_translation_values'
+# Current language of lazy_fields instances being saved (master values are
+# shown meanwhile)
+SAVED_LANGUAGE = '_translation_saved_language'
+# Languages translated, loaded by the admin changelist languages column
+TRANSLATED_LANGUAGES = '_translated_languages'
+# Related objects loaded by TransQuerySet.prefetch_related, by relation name
+PREFETCHED_OBJECTS = '_prefetched_objects'
+
+# Translations loading strategies (see ModelTranslation.loading option)
+JOIN_LOADING = 'join'
+PREFETCH_LOADING = 'prefetch'
+LOADING_STRATEGIES = (JOIN_LOADING, PREFETCH_LOADING)
+
+# Translations storage (see ModelTranslation.storage option)
+ROWS_STORAGE = 'rows'
+JSON_STORAGE = 'json'
+STORAGES = (ROWS_STORAGE, JSON_STORAGE)
 
 # Change form template and translation edition template
 CHANGE_TPL             = 'i18n/admin/change_form.html'
@@ -35,3 +61,32 @@ try:
     MULTIDB_SUPPORT = True
 except ImportError:
     MULTIDB_SUPPORT = False
+
+# Translation cache used by models registered with the cache option. The
+# backend is a django cache URI, its size is bounded by the backend itself
+# (max_entries and cull_frequency arguments for locmem, db and file caches,
+# memcached evicts LRU entries on its own)
+CACHE_BACKEND = getattr(settings, 'MODEL_I18N_CACHE_BACKEND',
+                        'locmem://?max_entries=10000&cull_frequency=3')
+CACHE_TIMEOUT = getattr(settings, 'MODEL_I18N_CACHE_TIMEOUT', 60 * 60)
+CACHE_KEY_PREFIX = getattr(settings, 'MODEL_I18N_CACHE_KEY_PREFIX', 'model_i18n')
+
+# Translation bundles (models registered with the bundle option) are stored
+# on the translation cache backend, which must be shared by every process
+# (not locmem, checked by validation), for MODEL_I18N_BUNDLE_TIMEOUT seconds and
+# kept in process memory for MODEL_I18N_BUNDLE_MEMORY_TTL seconds, then their
+# version is checked again
+BUNDLE_TIMEOUT = getattr(settings, 'MODEL_I18N_BUNDLE_TIMEOUT', 24 * 60 * 60)
+BUNDLE_MEMORY_TTL = getattr(settings, 'MODEL_I18N_BUNDLE_MEMORY_TTL', 30)
+
+# Translations written per chunk (and transaction) by bulk_upsert_translations
+BULK_CHUNK_SIZE = getattr(settings, 'MODEL_I18N_BULK_CHUNK_SIZE', 500)
+
+# Defer registration steps not needed to build the translation models (admin
+# setup, options validation on DEBUG mode and join SQL fragments compilation)
+# until the first request (or an explicit translator.setup_deferred call)
+DEFERRED_SETUP = getattr(settings, 'MODEL_I18N_DEFERRED_SETUP', False)
+
+# Translated queries instrumentation (see stats module), disabled by default.
+# Instrumentation is set up at import time, so it costs nothing when disabled
+STATS = getattr(settings, 'MODEL_I18N_STATS', False)
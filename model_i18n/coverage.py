@@ -0,0 +1,170 @@
+"""
+Translations coverage.
+
+Coverage is computed with a single GROUP BY query per model over the
+translation table, missing translations are listed with an anti-join
+(master LEFT JOIN translation ... WHERE translation is missing) paged by
+master pk. JSON data can't be inspected with SQL, models with json storage
+are reported reading their translation rows instead.
+"""
+from django.conf import settings
+from django.db import connection
+
+from model_i18n.conf import JSON_STORAGE, JSON_DATA_FIELD_NAME
+from model_i18n.query import fetch_translations, decode_translations
+from model_i18n.utils import get_master_language, get_translation_opts
+
+
+QN = connection.ops.quote_name # quote name
+
+
+def is_empty(field, value):
+    """ Python version of empty_sql """
+    return value is None or (field.empty_strings_allowed and value == '')
+
+
+def empty_sql(field, column):
+    """ SQL condition for a null (or empty string) `field` value """
+    if field.empty_strings_allowed:
+        return "(%s IS NULL OR %s = '')" % (column, column)
+    return '%s IS NULL' % column
+
+
+def get_coverage(model):
+    """ Returns `model` translations coverage as a dict in the form:
+
+        {'total': master instances count,
+         'languages': {language: {'translated': translations count,
+                                  'missing': instances without translation,
+                                  'fields': {name: untranslated values}}}}
+
+    Untranslated values count instances without translation plus
+    translations with null or empty `name` value. Every translation
+    language is included.
+    """
+    if get_translation_opts(model).storage == JSON_STORAGE:
+        return get_json_coverage(model)
+    trans_model = model._translation_model
+    trans_opts = trans_model._transmeta
+    get_field = trans_model._meta.get_field
+    fields = trans_opts.translatable_fields
+    lang_column = 't.%s' % QN(get_field(trans_opts.language_field_name).column)
+
+    empty = ['SUM(CASE WHEN %s THEN 1 ELSE 0 END)' %
+                    empty_sql(get_field(name), 't.%s' % QN(get_field(name).column))
+                for name in fields]
+    cursor = connection.cursor()
+    cursor.execute('SELECT c.total, %(lang)s, COUNT(t.%(pk)s), %(empty)s '
+                   'FROM (SELECT COUNT(*) AS total FROM %(master)s) c '
+                   'LEFT JOIN %(table)s t ON 1 = 1 '
+                   'GROUP BY c.total, %(lang)s' % {
+                        'lang': lang_column,
+                        'pk': QN(trans_model._meta.pk.column),
+                        'empty': ', '.join(empty),
+                        'master': QN(model._meta.db_table),
+                        'table': QN(trans_model._meta.db_table)})
+    rows = cursor.fetchall()
+
+    total = rows and rows[0][0] or 0
+    master = get_master_language(model)
+    counts = dict((row[1], row[2:]) for row in rows if row[1] is not None)
+    languages = {}
+    for lang, name in settings.LANGUAGES:
+        if lang == master:
+            continue
+        values = counts.get(lang, (0,) + (0,) * len(fields))
+        translated = values[0]
+        languages[lang] = {
+            'translated': translated,
+            'missing': total - translated,
+            'fields': dict((name, total - translated + int(value or 0))
+                                for name, value in zip(fields, values[1:]))
+        }
+    return {'total': total, 'languages': languages}
+
+
+def get_missing(model, language, fields=None, after=None, limit=100):
+    """ Returns up to `limit` master pks (ordered) missing `language`
+    translation, or any of `fields` translated values (null or empty) if
+    given. Pages start after the `after` pk. """
+    if get_translation_opts(model).storage == JSON_STORAGE:
+        return get_json_missing(model, language, fields, after, limit)
+    trans_model = model._translation_model
+    trans_opts = trans_model._transmeta
+    get_field = trans_model._meta.get_field
+    master_pk = 'm.%s' % QN(model._meta.pk.column)
+
+    missing = ['t.%s IS NULL' % QN(trans_model._meta.pk.column)]
+    missing.extend([empty_sql(get_field(name), 't.%s' % QN(get_field(name).column))
+                        for name in fields or ()])
+    where, params = ['(%s)' % ' OR '.join(missing)], [language]
+    if after is not None:
+        where.append('%s > %%s' % master_pk)
+        params.append(after)
+    cursor = connection.cursor()
+    cursor.execute('SELECT %(pk)s FROM %(master)s m '
+                   'LEFT JOIN %(table)s t ON t.%(fk)s = %(pk)s AND t.%(lang)s = %%s '
+                   'WHERE %(where)s ORDER BY %(pk)s LIMIT %(limit)d' % {
+                        'pk': master_pk,
+                        'master': QN(model._meta.db_table),
+                        'table': QN(trans_model._meta.db_table),
+                        'fk': QN(get_field(trans_opts.master_field_name).column),
+                        'lang': QN(get_field(trans_opts.language_field_name).column),
+                        'where': ' AND '.join(where),
+                        'limit': limit}, params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_json_coverage(model):
+    """ get_coverage for models with json storage, translations are
+    decoded from every translation row """
+    trans_model = model._translation_model
+    trans_opts = trans_model._transmeta
+    master = get_master_language(model)
+    languages = [lang for lang, name in settings.LANGUAGES if lang != master]
+    fields = [model._meta.get_field(name)
+                for name in trans_opts.translatable_fields]
+    rows = trans_model._default_manager.values_list(
+                trans_opts.master_field_name, 'pk', JSON_DATA_FIELD_NAME)
+    translated = dict((lang, [0, [0] * len(fields)]) for lang in languages)
+    for (pk, lang), value in decode_translations(model, rows,
+                                                 languages).iteritems():
+        counts = translated[lang]
+        counts[0] += 1
+        for index, field in enumerate(fields):
+            if is_empty(field, value[index + 1]):
+                counts[1][index] += 1
+
+    total = model._default_manager.get_master_query_set().count()
+    return {'total': total,
+            'languages': dict((lang, {
+                'translated': count,
+                'missing': total - count,
+                'fields': dict((field.name, total - count + empty)
+                                    for field, empty in zip(fields, empties))
+            }) for lang, (count, empties) in translated.iteritems())}
+
+
+def get_json_missing(model, language, fields=None, after=None, limit=100):
+    """ get_missing for models with json storage, master pks are read by
+    pages of `limit` and checked against their decoded translations """
+    names = get_translation_opts(model).translatable_fields
+    fields = [(names.index(name) + 1, model._meta.get_field(name))
+                for name in fields or ()]
+    queryset = model._default_manager.get_master_query_set().order_by('pk')
+    missing = []
+    while len(missing) < limit:
+        page = queryset
+        if after is not None:
+            page = page.filter(pk__gt=after)
+        pks = list(page.values_list('pk', flat=True)[:limit])
+        if not pks:
+            break
+        values = fetch_translations(model, pks, [language])
+        for pk in pks:
+            value = values.get((pk, language))
+            if value is None or [field for index, field in fields
+                                    if is_empty(field, value[index])]:
+                missing.append(pk)
+        after = pks[-1]
+    return missing[:limit]
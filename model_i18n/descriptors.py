@@ -0,0 +1,116 @@
+"""
+Master model descriptors. Translated values loaded by TransQuerySet are
+kept on a single per-instance store (see store.TranslationStore), these
+descriptors expose them as the usual instance attributes:
+
+    * current_languages, current_language
+    * <name>_<ATTR_BACKUP_SUFFIX>
+    * <name>_<language> and id_<language>
+    * translatable fields, just for models registered with the lazy_fields
+      option, which resolve the current language value when read
+"""
+from model_i18n.conf import ATTR_BACKUP_SUFFIX, CURRENT_LANGUAGES, \
+                            CURRENT_LANGUAGE, TRANSLATION_VALUES
+
+
+class StoreAttribute(object):
+    """ Proxies a store slot, the attribute is kept on the instance if it
+    has no store (wasn't loaded by a TransQuerySet) """
+    def __init__(self, name, slot):
+        self.name = name
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        store = instance.__dict__.get(TRANSLATION_VALUES)
+        if store is None:
+            return instance.__dict__.get(self.name)
+        return getattr(store, self.slot)
+
+    def __set__(self, instance, value):
+        store = instance.__dict__.get(TRANSLATION_VALUES)
+        if store is None:
+            instance.__dict__[self.name] = value
+        else:
+            setattr(store, self.slot, value)
+
+
+class TranslatedField(object):
+    """ Translatable field descriptor. Returns the value for instance
+    current language or the master value if there's no translation.
+    Assignments override the current language value (the master value
+    if no language is selected), like setting the attribute on a model
+    registered without lazy_fields.
+    """
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        store = instance.__dict__.get(TRANSLATION_VALUES)
+        if store is not None and store.current:
+            value = store.get(store.current, self.index)
+            if value is not None: # None means not translated
+                return value
+        return instance.__dict__.get(self.name)
+
+    def __set__(self, instance, value):
+        store = instance.__dict__.get(TRANSLATION_VALUES)
+        if store is not None and store.current in store.languages:
+            store.set(store.current, self.index, value)
+        else:
+            instance.__dict__[self.name] = value
+
+
+class MasterValue(object):
+    """ <name>_<ATTR_BACKUP_SUFFIX> descriptor, returns the master value """
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        store = instance.__dict__.get(TRANSLATION_VALUES)
+        if store is not None and store.master is not None:
+            return store.master[self.index]
+        return instance.__dict__.get(self.name)
+
+
+class TranslationValue(object):
+    """ <name>_<language> descriptor, returns the loaded translated value """
+    def __init__(self, lang, index):
+        self.lang = lang
+        self.index = index
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        store = instance.__dict__.get(TRANSLATION_VALUES)
+        if store is None:
+            return None
+        return store.get(self.lang, self.index)
+
+
+def setup_descriptors(master_model, translation_model, languages):
+    """ Adds translations descriptors to master_model, <name>_<language>
+    and id_<language> descriptors are added for every language in
+    `languages` """
+    trans_opts = translation_model._transmeta
+    setattr(master_model, CURRENT_LANGUAGES,
+            StoreAttribute(CURRENT_LANGUAGES, 'languages'))
+    setattr(master_model, CURRENT_LANGUAGE,
+            StoreAttribute(CURRENT_LANGUAGE, 'current'))
+    for lang in languages:
+        setattr(master_model, 'id_%s' % lang, TranslationValue(lang, 0))
+    for index, name in enumerate(trans_opts.translatable_fields):
+        if trans_opts.lazy_fields:
+            setattr(master_model, name, TranslatedField(name, index + 1))
+        setattr(master_model, '_'.join((name, ATTR_BACKUP_SUFFIX)),
+                MasterValue(name, index))
+        for lang in languages:
+            setattr(master_model, '%s_%s' % (name, lang),
+                    TranslationValue(lang, index + 1))
@@ -3,6 +3,11 @@ class AlreadyRegistered(Exception):
     pass
 
 
+class NotRegistered(Exception):
+    """Object is not registered"""
+    pass
+
+
 class OptionWarning(Warning):
     """Warning about option values"""
     pass
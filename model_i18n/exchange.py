@@ -0,0 +1,299 @@
+"""
+Translations export and import, in gettext PO and JSONL formats.
+
+Exports iterate master instances by chunks (ordered by pk, each chunk
+starts after the last pk seen) and load their translations with a single
+query per chunk, imports read files line by line and write translations
+with bulk_upsert_translations, so memory use doesn't depend on table size.
+
+PO entries are a translated field value for a master instance, the
+msgctxt identifies it as <app label>.<model name>:<pk>:<field name>, the
+msgid is the master value. JSONL lines are translations objects in the
+form:
+
+    {"pk": 1, "language": "es", "fields": {"title": "...", ...}}
+
+Translations can be imported from a table with the other storage layout
+too (rows or json, see ModelTranslation.storage), to switch a model storage.
+"""
+import time
+
+from django.db import connection
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import simplejson
+from django.utils.encoding import force_unicode
+
+from model_i18n.conf import JSON_STORAGE, JSON_DATA_FIELD_NAME, \
+                            TRANSLATION_TABLE_SUFFIX, JSON_TABLE_SUFFIX
+from model_i18n.query import fetch_translations
+from model_i18n.translator import bulk_upsert_translations
+
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def iter_masters(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """ Yields `model` instances master values by chunks, as lists of
+    (pk, values) tuples with values in translatable_fields order """
+    fields = model._translation_model._transmeta.translatable_fields
+    queryset = model._default_manager.get_master_query_set().order_by('pk')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(pk__gt=last)
+        chunk = [(row[0], row[1:])
+                    for row in chunk.values_list('pk', *fields)[:chunk_size]]
+        if not chunk:
+            break
+        last = chunk[-1][0]
+        yield chunk
+
+
+def iter_translations(model, languages, untranslated=False,
+                      chunk_size=EXPORT_CHUNK_SIZE):
+    """ Yields (pk, language, master values, translated values) tuples for
+    every `model` instance translated to any of `languages`, values are
+    {field name: value} dicts. Instances without translation are included
+    (translated values is None) if `untranslated` is True. """
+    fields = model._translation_model._transmeta.translatable_fields
+    for chunk in iter_masters(model, chunk_size):
+        loaded = fetch_translations(model, [pk for pk, _ in chunk], languages)
+        for pk, master in chunk:
+            master = dict(zip(fields, master))
+            for lang in languages:
+                values = loaded.get((pk, lang))
+                if values is not None:
+                    yield pk, lang, master, dict(zip(fields, values[1:]))
+                elif untranslated:
+                    yield pk, lang, master, None
+
+
+def get_context(model, pk, name):
+    """ PO entries context """
+    return '%s.%s:%s:%s' % (model._meta.app_label,
+                            model._meta.object_name.lower(), pk, name)
+
+
+def parse_context(model, context):
+    """ Returns (pk, field name) from a PO entry context, None if context
+    belongs to another model """
+    try:
+        label, pk, name = context.split(':')
+    except ValueError:
+        return None
+    if label != '%s.%s' % (model._meta.app_label,
+                           model._meta.object_name.lower()):
+        return None
+    return pk, name
+
+
+def po_quote(value):
+    """ Returns `value` as a PO string, multiline values are split """
+    value = force_unicode(value or '')
+    value = value.replace('\\', '\\\\').replace('"', '\\"')\
+                 .replace('\t', '\\t').replace('\r', '\\r')
+    lines = value.split('\n')
+    if len(lines) == 1:
+        return u'"%s"' % lines[0]
+    lines = [line + '\\n' for line in lines[:-1]] + [lines[-1]]
+    return u'""\n' + u'\n'.join([u'"%s"' % line for line in lines if line])
+
+
+def po_unquote(value):
+    """ Inverse of po_quote for a single PO string line """
+    value = value.strip()[1:-1]
+    chars, escaped = [], False
+    for char in value:
+        if escaped:
+            chars.append({'n': '\n', 't': '\t', 'r': '\r'}.get(char, char))
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        else:
+            chars.append(char)
+    return u''.join(chars)
+
+
+def write_po(model, language, entries, stream):
+    """ Writes `entries` (see iter_translations) for `language` to
+    `stream` in PO format, returns the number of entries written """
+    stream.write(u'msgid ""\nmsgstr ""\n'
+                 u'"Project-Id-Version: %s.%s\\n"\n'
+                 u'"POT-Creation-Date: %s\\n"\n'
+                 u'"Language: %s\\n"\n'
+                 u'"MIME-Version: 1.0\\n"\n'
+                 u'"Content-Type: text/plain; charset=UTF-8\\n"\n'
+                 u'"Content-Transfer-Encoding: 8bit\\n"\n' % (
+                    model._meta.app_label, model._meta.object_name,
+                    time.strftime('%Y-%m-%d %H:%M%z'), language))
+    fields = model._translation_model._transmeta.translatable_fields
+    count = 0
+    for pk, lang, master, values in entries:
+        for name in fields:
+            stream.write(u'\nmsgctxt %s\nmsgid %s\nmsgstr %s\n' % (
+                            po_quote(get_context(model, pk, name)),
+                            po_quote(master[name]),
+                            po_quote(values and values[name])))
+            count += 1
+    return count
+
+
+def iter_po_entries(stream):
+    """ Yields PO file entries as dicts with flags, msgctxt, msgid and
+    msgstr keys (just the ones found on the entry) """
+    entry, key = {'flags': ''}, None
+    for line in stream:
+        line = force_unicode(line).strip()
+        if line.startswith('"'): # continuation line
+            if key:
+                entry[key] += po_unquote(line)
+            continue
+        if 'msgstr' in entry and (not line or line[0] == '#' or
+                                  line.startswith('msgctxt') or
+                                  line.startswith('msgid')):
+            yield entry
+            entry, key = {'flags': ''}, None
+        if not line:
+            continue
+        elif line.startswith('#,'):
+            entry['flags'] += line[2:]
+        elif line[0] != '#':
+            key, value = line.split(None, 1)
+            entry[key] = po_unquote(value)
+    if 'msgstr' in entry:
+        yield entry
+
+
+def read_po(model, stream, language=None):
+    """ Yields (pk, language, {field name: value}) rows from a PO file,
+    `language` defaults to the file header Language. Empty, fuzzy and
+    other models entries are skipped. """
+    for entry in iter_po_entries(stream):
+        if 'msgctxt' not in entry:
+            if not entry.get('msgid') and not language: # header
+                for header in entry['msgstr'].split('\n'):
+                    if header.startswith('Language:'):
+                        language = header.split(':', 1)[1].strip()
+            continue
+        if 'fuzzy' in entry['flags'] or not entry['msgstr']:
+            continue
+        parsed = parse_context(model, entry['msgctxt'])
+        if parsed is None:
+            continue
+        if not language:
+            raise ValueError('Unknown PO file language')
+        pk, name = parsed
+        yield model._meta.pk.to_python(pk), language, {str(name): entry['msgstr']}
+
+
+def write_jsonl(entries, stream):
+    """ Writes `entries` (see iter_translations) to `stream`, a JSON object
+    per line. Returns the number of lines written. """
+    count = 0
+    for pk, lang, master, values in entries:
+        stream.write(simplejson.dumps({'pk': pk, 'language': lang,
+                                       'fields': values},
+                                      cls=DjangoJSONEncoder) + '\n')
+        count += 1
+    return count
+
+
+def read_jsonl(stream):
+    """ Yields (pk, language, {field name: value}) rows from a JSONL file,
+    null values and untranslated lines are skipped """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        data = simplejson.loads(line)
+        fields = dict((str(name), value)
+                        for name, value in (data.get('fields') or {}).iteritems()
+                            if value is not None)
+        if fields:
+            yield data['pk'], data['language'], fields
+
+
+def export_translations(model, languages, stream, format='jsonl',
+                        untranslated=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """ Writes `model` translations to `languages` on `stream` in `format`
+    (po or jsonl, just one language for po). Returns the number of entries
+    written. """
+    entries = iter_translations(model, languages, untranslated, chunk_size)
+    if format == 'po':
+        if len(languages) != 1:
+            raise ValueError('PO exports must be for a single language')
+        return write_po(model, languages[0], entries, stream)
+    return write_jsonl(entries, stream)
+
+
+def import_translations(model, stream, format='jsonl', language=None,
+                        chunk_size=None):
+    """ Reads `model` translations from `stream` in `format` (po or jsonl)
+    and writes them in bulk. `language` overrides PO file language. Returns
+    (created, updated) counts. """
+    if format == 'po':
+        rows = read_po(model, stream, language)
+    else:
+        rows = read_jsonl(stream)
+    return bulk_upsert_translations(model, rows, chunk_size)
+
+
+def get_storage_table(model):
+    """ Returns the default table name of `model` translations with the
+    storage layout `model` isn't using """
+    if model._translation_model._transmeta.storage == JSON_STORAGE:
+        suffix = TRANSLATION_TABLE_SUFFIX
+    else:
+        suffix = JSON_TABLE_SUFFIX
+    return '_'.join([model._meta.db_table, suffix])
+
+
+def read_storage_table(model, table, chunk_size=EXPORT_CHUNK_SIZE):
+    """ Yields (pk, language, {field name: value}) rows from `table`, a
+    `model` translations table with the storage layout `model` isn't using:
+    json data rows if `model` uses rows storage, a row per language
+    otherwise. Columns are named as the translation model would name them,
+    null values and master language values are skipped. """
+    trans_opts = model._translation_model._transmeta
+    fields = [model._meta.get_field(name)
+                for name in trans_opts.translatable_fields]
+    master = trans_opts.master_language
+    qn = connection.ops.quote_name
+    fk = qn('%s_id' % trans_opts.master_field_name)
+    cursor = connection.cursor()
+    if trans_opts.storage == JSON_STORAGE:
+        cursor.execute('SELECT %s, %s, %s FROM %s ORDER BY %s' % (
+                            fk, qn(trans_opts.language_field_name),
+                            ', '.join([qn(field.column) for field in fields]),
+                            qn(table), fk))
+    else:
+        cursor.execute('SELECT %s, %s FROM %s ORDER BY %s' % (
+                            fk, qn(JSON_DATA_FIELD_NAME), qn(table), fk))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            if trans_opts.storage == JSON_STORAGE:
+                translations = [(row[1], zip(fields, row[2:]))]
+            else:
+                translations = [(lang, [(field, values.get(field.name))
+                                            for field in fields])
+                                    for lang, values in
+                                        sorted(simplejson.loads(row[1] or '{}')
+                                                         .iteritems())]
+            for lang, values in translations:
+                values = dict((field.name, field.to_python(value))
+                                for field, value in values if value is not None)
+                if lang != master and values:
+                    yield row[0], str(lang), values
+
+
+def convert_storage(model, table=None, chunk_size=None):
+    """ Writes `model` translations read from `table` (with the storage
+    layout `model` isn't using, get_storage_table by default) on `model`
+    translations table, in bulk. Returns (created, updated) counts. """
+    rows = read_storage_table(model, table or get_storage_table(model),
+                              chunk_size or EXPORT_CHUNK_SIZE)
+    return bulk_upsert_translations(model, rows, chunk_size)
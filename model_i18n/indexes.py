@@ -0,0 +1,187 @@
+"""
+Translation tables indexes.
+
+Every translation join filters on the (master, language) pair, translation
+models declare it unique_together so syncdb creates the index. Covering
+indexes (covering_index option) and indexes on tables created before can
+be created with the i18n_indexes management command.
+
+Translated columns must allow NULL (not translated) values, tables created
+before translatable fields were nullable are reported by i18n_indexes
+command too, with the ALTER statements that fix them.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.backends.util import truncate_name
+
+from model_i18n.conf import MULTIDB_SUPPORT, JSON_STORAGE
+
+
+def get_engine():
+    """ Returns current database backend name (sqlite3, mysql, ...) """
+    settings_dict = getattr(connection, 'settings_dict', None)
+    if settings_dict:
+        return settings_dict['ENGINE'].split('.')[-1]
+    return settings.DATABASE_ENGINE
+
+
+def get_indexes(model):
+    """ Returns the indexes wanted on `model` translation table, as a list
+    of (name, columns, included columns, unique) tuples """
+    trans_model = model._translation_model
+    trans_opts = trans_model._transmeta
+    get_column = lambda name: trans_model._meta.get_field(name).column
+    table = trans_model._meta.db_table
+    max_length = connection.ops.max_name_length()
+
+    if trans_opts.storage == JSON_STORAGE: # a row per master instance
+        key = (get_column(trans_opts.master_field_name),)
+    else:
+        key = (get_column(trans_opts.master_field_name),
+               get_column(trans_opts.language_field_name))
+    indexes = [(truncate_name('%s_i18n_key' % table, max_length), key, (),
+                True)]
+
+    covering = trans_opts.covering_index
+    if covering:
+        if covering is True:
+            covering = trans_opts.translatable_fields
+        indexes.append((truncate_name('%s_i18n_covering' % table, max_length),
+                        key, tuple([get_column(name) for name in covering]),
+                        False))
+    return indexes
+
+
+def get_table_indexes(cursor, table):
+    """ Returns indexes defined on `table` as (columns, unique) tuples """
+    engine = get_engine()
+    if engine == 'sqlite3':
+        cursor.execute('PRAGMA index_list(%s)' % connection.ops.quote_name(table))
+        indexes = []
+        for row in cursor.fetchall():
+            name, unique = row[1], row[2]
+            cursor.execute('PRAGMA index_info(%s)' % connection.ops.quote_name(name))
+            columns = [info[2] for info in sorted(cursor.fetchall())]
+            indexes.append((tuple(columns), bool(unique)))
+        return indexes
+    elif engine.startswith('postgresql'):
+        cursor.execute('SELECT attnum, attname FROM pg_attribute '
+                       'WHERE attrelid = %s::regclass AND attnum > 0', [table])
+        names = dict(cursor.fetchall())
+        cursor.execute('SELECT i.indkey, i.indisunique FROM pg_index i '
+                       'WHERE i.indrelid = %s::regclass', [table])
+        return [(tuple([names.get(int(num)) for num in str(indkey).split()]),
+                 unique) for indkey, unique in cursor.fetchall()]
+    elif engine == 'mysql':
+        cursor.execute('SHOW INDEX FROM %s' % connection.ops.quote_name(table))
+        indexes = {}
+        for row in cursor.fetchall():
+            non_unique, name, seq, column = row[1:5]
+            indexes.setdefault(name, [not non_unique, {}])[1][seq] = column
+        return [(tuple([columns[seq] for seq in sorted(columns)]), unique)
+                    for unique, columns in indexes.itervalues()]
+    raise NotImplementedError('Indexes introspection is not supported on '
+                              '"%s" backend' % engine)
+
+
+def get_not_null_columns(cursor, table):
+    """ Returns the names of `table` columns defined NOT NULL """
+    engine = get_engine()
+    if engine == 'sqlite3':
+        # SELECT on pragma_table_info (SQLite 3.16+), PRAGMA statements commit
+        # the current transaction on pysqlite
+        cursor.execute('SELECT name FROM pragma_table_info(%s) '
+                       'WHERE "notnull"', [table])
+        return [row[0] for row in cursor.fetchall()]
+    elif engine.startswith('postgresql'):
+        cursor.execute('SELECT attname FROM pg_attribute '
+                       'WHERE attrelid = %s::regclass AND attnum > 0 '
+                       'AND attnotnull AND NOT attisdropped', [table])
+        return [row[0] for row in cursor.fetchall()]
+    elif engine == 'mysql':
+        cursor.execute('SELECT column_name FROM information_schema.columns '
+                       'WHERE table_schema = DATABASE() AND table_name = %s '
+                       'AND is_nullable = %s', [table, 'NO'])
+        return [row[0] for row in cursor.fetchall()]
+    raise NotImplementedError('Columns introspection is not supported on '
+                              '"%s" backend' % engine)
+
+
+def get_not_null_fields(model, cursor=None):
+    """ Returns `model` translation model translatable fields whose
+    columns are NOT NULL on database, so they can't store not translated
+    values """
+    trans_model = model._translation_model
+    if trans_model._transmeta.storage == JSON_STORAGE:
+        return []
+    cursor = cursor or connection.cursor()
+    columns = get_not_null_columns(cursor, trans_model._meta.db_table)
+    return [field for field in trans_model._meta.fields
+                if field.name in trans_model._transmeta.translatable_fields
+                    and field.column in columns]
+
+
+def alter_null_sql(model, field):
+    """ Returns the ALTER TABLE statement which allows NULL values on
+    `model` translation table `field` column, None on SQLite (it can't
+    alter columns, the table must be rebuilt) """
+    qn = connection.ops.quote_name
+    table = qn(model._translation_model._meta.db_table)
+    engine = get_engine()
+    if engine.startswith('postgresql'):
+        return 'ALTER TABLE %s ALTER COLUMN %s DROP NOT NULL;' % (
+                    table, qn(field.column))
+    elif engine == 'mysql':
+        if MULTIDB_SUPPORT:
+            db_type = field.db_type(connection=connection)
+        else:
+            db_type = field.db_type()
+        return 'ALTER TABLE %s MODIFY %s %s NULL;' % (table, qn(field.column),
+                                                     db_type)
+    return None
+
+
+def is_covered(index, table_indexes):
+    """ Checks if `index` (see get_indexes) is already provided by any of
+    `table_indexes` (see get_table_indexes) """
+    name, key, included, unique = index
+    for columns, table_unique in table_indexes:
+        if unique:
+            if table_unique and set(columns) == set(key):
+                return True
+        elif set(columns[:len(key)]) == set(key) and \
+             set(included).issubset(columns[len(key):]):
+            return True
+    return False
+
+
+def get_missing_indexes(model, cursor=None):
+    """ Returns `model` translation table indexes (see get_indexes) not
+    found on database """
+    cursor = cursor or connection.cursor()
+    table_indexes = get_table_indexes(cursor,
+                                      model._translation_model._meta.db_table)
+    return [index for index in get_indexes(model)
+                if not is_covered(index, table_indexes)]
+
+
+def create_index_sql(model, index):
+    """ Returns CREATE INDEX statement for `index` (see get_indexes). Included
+    columns are added as INCLUDE columns on PostgreSQL 11+, as trailing key
+    columns otherwise """
+    qn = connection.ops.quote_name
+    name, key, included, unique = index
+    columns = ', '.join([qn(column) for column in key])
+    include = ''
+    if included:
+        version = get_engine().startswith('postgresql') and \
+                  connection.ops.postgres_version or ()
+        if tuple(version) >= (11,):
+            include = ' INCLUDE (%s)' % ', '.join([qn(column)
+                                                    for column in included])
+        else:
+            columns = ', '.join([columns] + [qn(column) for column in included])
+    return 'CREATE %sINDEX %s ON %s (%s)%s;' % (unique and 'UNIQUE ' or '',
+                                                qn(name),
+                                                qn(model._translation_model._meta.db_table),
+                                                columns, include)
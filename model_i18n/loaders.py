@@ -3,6 +3,10 @@ from os.path import dirname
 from model_i18n.utils import import_module
 
 
+# Discovered modules, by module name
+_discovered = {}
+
+
 def autodiscover(module_name='translations'):
     """
     Auto-discover translations.py files in installed app's directories, fail
@@ -10,10 +14,18 @@ def autodiscover(module_name='translations'):
     translation bits they may want.
 
     Based on django's contrib.admin autodiscover().
+
+    Discovery runs once per `module_name` (nested calls from discovered
+    modules included), later calls return the modules names imported the
+    first time.
     """
+    if module_name in _discovered:
+        return _discovered[module_name]
+
     import imp
     from django.conf import settings
 
+    discovered = _discovered[module_name] = []
     for app in settings.INSTALLED_APPS:
         # For each app, we need to look for `module_name` in that app's
         # package. We can't use os.path here -- recall that modules may be
@@ -42,3 +54,5 @@ def autodiscover(module_name='translations'):
         # Step 3: import the app's translation file. If this has errors we want them
         # to bubble up.
         import_module('.'.join([app, module_name]))
+        discovered.append('.'.join([app, module_name]))
+    return discovered
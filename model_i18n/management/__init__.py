@@ -0,0 +1,60 @@
+import warnings
+
+from django.db import connection
+from django.db.models import signals, get_models
+
+from model_i18n.exceptions import OptionWarning
+from model_i18n.indexes import get_missing_indexes, create_index_sql, \
+                               get_not_null_fields
+
+
+def create_covering_indexes(sender, created_models, **kwargs):
+    """ Creates covering indexes (covering_index option) on translation
+    tables created by syncdb, (master, language) unique index is already
+    created by syncdb. Backends without indexes introspection are skipped
+    with a warning, i18n_indexes command reports them as errors """
+    from model_i18n.translator import get_registered_models
+
+    cursor = connection.cursor()
+    for model in get_registered_models():
+        if model._translation_model not in created_models or \
+           not model._translation_model._transmeta.covering_index:
+            continue
+        try:
+            missing = get_missing_indexes(model, cursor)
+        except NotImplementedError, e:
+            warnings.warn(OptionWarning('%s, covering indexes not created' % e))
+            return
+        for index in missing:
+            cursor.execute(create_index_sql(model, index))
+
+signals.post_syncdb.connect(create_covering_indexes,
+                            dispatch_uid='model_i18n.create_covering_indexes')
+
+
+def check_translated_columns(sender, created_models, **kwargs):
+    """ Warns about translated columns which don't allow NULL (not
+    translated) values on `sender` app translation tables created before
+    translatable fields were nullable, i18n_indexes command reports the
+    ALTER statements which fix them """
+    from model_i18n.translator import get_registered_models
+
+    cursor = connection.cursor()
+    for model in get_registered_models():
+        trans_model = model._translation_model
+        if trans_model in created_models or \
+           trans_model not in get_models(sender):
+            continue
+        try:
+            fields = get_not_null_fields(model, cursor)
+        except NotImplementedError:
+            return
+        if fields:
+            warnings.warn(OptionWarning('%s translated columns %s are NOT '
+                                        'NULL, run i18n_indexes command' % (
+                                        trans_model._meta.db_table,
+                                        ', '.join([field.column
+                                                    for field in fields]))))
+
+signals.post_syncdb.connect(check_translated_columns,
+                            dispatch_uid='model_i18n.check_translated_columns')
@@ -0,0 +1,16 @@
+from django.db import models
+from django.core.management.base import CommandError
+
+from model_i18n.translator import get_registered_models
+
+
+def get_registered_model(label):
+    """ Returns the registered model for an appname.ModelName label """
+    try:
+        app_label, model_name = label.split('.')
+    except ValueError:
+        raise CommandError('Invalid model "%s", use appname.ModelName' % label)
+    model = models.get_model(app_label, model_name)
+    if model not in get_registered_models():
+        raise CommandError('Model "%s" is not registered for translation' % label)
+    return model
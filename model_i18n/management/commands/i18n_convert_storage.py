@@ -0,0 +1,35 @@
+from optparse import make_option
+
+from django.db import DatabaseError
+from django.core.management.base import BaseCommand, CommandError
+
+from model_i18n.exchange import convert_storage, get_storage_table
+from model_i18n.management.commands import get_registered_model
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--table', dest='table', default=None,
+            help='Table to read translations from, the model table name '
+                 'followed by the other storage table suffix by default.'),
+        make_option('--chunk-size', type='int', dest='chunk_size',
+            default=None, help='Translations written per transaction.'),
+    )
+    help = 'Copies a registered model translations from a table with the ' \
+           'other storage layout (rows or json) to its translation table, ' \
+           'run it after changing the model storage option.'
+    args = 'appname.ModelName'
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Enter appname.ModelName')
+        model = get_registered_model(args[0])
+        table = options['table'] or get_storage_table(model)
+        try:
+            created, updated = convert_storage(model, table,
+                                               options['chunk_size'])
+        except (DatabaseError, ValueError), e:
+            raise CommandError('%s: %s' % (table, e))
+        if int(options.get('verbosity', 1)) > 0:
+            print '%s: %d translations created, %d updated' % (table, created,
+                                                               updated)
@@ -0,0 +1,70 @@
+from optparse import make_option
+
+from django.conf import settings
+from django.utils import simplejson
+from django.core.management.base import BaseCommand, CommandError
+
+from model_i18n.translator import get_registered_models
+from model_i18n.coverage import get_coverage, get_missing
+from model_i18n.management.commands import get_registered_model
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--json', action='store_true', dest='json',
+            default=False, help='Output coverage as JSON.'),
+        make_option('--missing', dest='missing', default=None,
+            help='List master pks missing this language translation '
+                 '(a single model must be given).'),
+        make_option('--fields', dest='fields', default='',
+            help='Comma separated fields, with --missing pks with null or '
+                 'empty translated values are listed too.'),
+        make_option('--after', dest='after', default=None,
+            help='With --missing, list pks after this one.'),
+        make_option('--limit', type='int', dest='limit', default=100,
+            help='With --missing, maximum number of pks listed.'),
+    )
+    help = 'Reports translations coverage, per language and field, of ' \
+           'registered models.'
+    args = '[appname.ModelName ...]'
+
+    def handle(self, *labels, **options):
+        if labels:
+            selected = [get_registered_model(label) for label in labels]
+        else:
+            selected = get_registered_models()
+
+        if options['missing']:
+            if len(selected) != 1:
+                raise CommandError('--missing needs a single appname.ModelName')
+            if options['missing'] not in dict(settings.LANGUAGES):
+                raise CommandError('Invalid language "%s"' % options['missing'])
+            model = selected[0]
+            fields = [name for name in options['fields'].split(',') if name]
+            unknown = set(fields).difference(model._translation_model\
+                                                  ._transmeta.translatable_fields)
+            if unknown:
+                raise CommandError('Non translatable fields: %s'
+                                   % ', '.join(sorted(unknown)))
+            pks = get_missing(model, options['missing'], fields,
+                              options['after'], options['limit'])
+            return '\n'.join([unicode(pk) for pk in pks])
+
+        report = dict(('%s.%s' % (model._meta.app_label, model._meta.object_name),
+                       get_coverage(model)) for model in selected)
+        if options['json']:
+            return simplejson.dumps(report, indent=2, sort_keys=True)
+
+        output = []
+        for label, coverage in sorted(report.items()):
+            total = coverage['total']
+            output.append('%s (%d instances)' % (label, total))
+            for lang, values in sorted(coverage['languages'].items()):
+                percent = 100.0 * values['translated'] / total if total else 100.0
+                fields = ', '.join(['%s: %d' % item
+                                        for item in sorted(values['fields'].items())])
+                output.append('  %s: %d translated, %d missing (%.1f%%); '
+                              'untranslated values %s' % (lang,
+                                  values['translated'], values['missing'],
+                                  percent, fields))
+        return '\n'.join(output)
@@ -0,0 +1,63 @@
+import sys
+import codecs
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from model_i18n.utils import get_master_language
+from model_i18n.exchange import export_translations, EXPORT_CHUNK_SIZE
+from model_i18n.management.commands import get_registered_model
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', default='jsonl',
+            help='Output format, po or jsonl (default).'),
+        make_option('--languages', dest='languages', default='',
+            help='Comma separated languages to export, every translation '
+                 'language by default (a single one for po).'),
+        make_option('--output', dest='output', default=None,
+            help='Output file, standard output by default.'),
+        make_option('--untranslated', action='store_true',
+            dest='untranslated', default=False,
+            help='Include instances without translation.'),
+        make_option('--chunk-size', type='int', dest='chunk_size',
+            default=EXPORT_CHUNK_SIZE,
+            help='Master instances loaded per query.'),
+    )
+    help = 'Exports a registered model translations as gettext PO or JSONL.'
+    args = 'appname.ModelName'
+
+    def handle(self, *labels, **options):
+        if len(labels) != 1:
+            raise CommandError('Enter a single appname.ModelName')
+        model = get_registered_model(labels[0])
+        if options['format'] not in ('po', 'jsonl'):
+            raise CommandError('Unknown format "%s"' % options['format'])
+
+        master = get_master_language(model)
+        available = [code for code, name in settings.LANGUAGES if code != master]
+        languages = [code for code in options['languages'].split(',') if code] \
+                        or available
+        invalid = set(languages).difference(available)
+        if invalid:
+            raise CommandError('Invalid languages: %s' % ', '.join(sorted(invalid)))
+        if options['format'] == 'po' and len(languages) != 1:
+            raise CommandError('PO exports must be for a single language, '
+                               'use --languages')
+
+        if options['output']:
+            stream = codecs.open(options['output'], 'w', 'utf-8')
+        else:
+            stream = codecs.getwriter('utf-8')(sys.stdout)
+        try:
+            count = export_translations(model, languages, stream,
+                                        options['format'],
+                                        options['untranslated'],
+                                        options['chunk_size'])
+        finally:
+            if options['output']:
+                stream.close()
+        if options['output'] and int(options.get('verbosity', 1)) > 0:
+            print 'Exported %d entries to %s' % (count, options['output'])
@@ -0,0 +1,45 @@
+import codecs
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from model_i18n.exchange import import_translations
+from model_i18n.management.commands import get_registered_model
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', default=None,
+            help='Input format, po or jsonl. Taken from the file extension '
+                 'by default.'),
+        make_option('--language', dest='language', default=None,
+            help='Translations language for po files, taken from the file '
+                 'header by default.'),
+        make_option('--chunk-size', type='int', dest='chunk_size',
+            default=None, help='Translations written per transaction.'),
+    )
+    help = 'Imports a registered model translations from gettext PO or ' \
+           'JSONL files (see i18n_export).'
+    args = 'appname.ModelName file [file ...]'
+
+    def handle(self, *args, **options):
+        if len(args) < 2:
+            raise CommandError('Enter appname.ModelName and the files to import')
+        model = get_registered_model(args[0])
+        for path in args[1:]:
+            format = options['format'] or path.rsplit('.', 1)[-1].lower()
+            if format not in ('po', 'jsonl'):
+                raise CommandError('Unknown format for "%s", use --format' % path)
+            stream = codecs.open(path, 'r', 'utf-8')
+            try:
+                try:
+                    created, updated = import_translations(model, stream, format,
+                                                           options['language'],
+                                                           options['chunk_size'])
+                except ValueError, e:
+                    raise CommandError('%s: %s' % (path, e))
+            finally:
+                stream.close()
+            if int(options.get('verbosity', 1)) > 0:
+                print '%s: %d translations created, %d updated' % (path, created,
+                                                                   updated)
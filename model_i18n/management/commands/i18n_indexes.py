@@ -0,0 +1,54 @@
+import sys
+from optparse import make_option
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+
+from model_i18n.translator import get_registered_models
+from model_i18n.indexes import get_missing_indexes, create_index_sql, \
+                               get_not_null_fields, alter_null_sql
+from model_i18n.management.commands import get_registered_model
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--create', action='store_true', dest='create',
+            default=False, help='Create missing indexes instead of just '
+                'printing their SQL.'),
+    )
+    help = 'Reports missing (master, language) and covering indexes on ' \
+           'translation tables of registered models, and translated ' \
+           'columns which don\'t allow NULL (not translated) values.'
+    args = '[appname.ModelName ...]'
+
+    def handle(self, *labels, **options):
+        if labels:
+            selected = [get_registered_model(label) for label in labels]
+        else:
+            selected = get_registered_models()
+
+        cursor = connection.cursor()
+        output = []
+        for model in selected:
+            try:
+                missing = get_missing_indexes(model, cursor)
+                not_null = get_not_null_fields(model, cursor)
+            except NotImplementedError, e:
+                raise CommandError(e)
+            statements = [create_index_sql(model, index) for index in missing]
+            for field in not_null:
+                sql = alter_null_sql(model, field)
+                if sql is None:
+                    sys.stderr.write('%s.%s column is NOT NULL, rebuild the '
+                                     'table to allow NULL values\n' % (
+                                     model._translation_model._meta.db_table,
+                                     field.column))
+                else:
+                    statements.append(sql)
+            for sql in statements:
+                output.append(sql)
+                if options['create']:
+                    cursor.execute(sql)
+        if options['create'] and output:
+            transaction.commit_unless_managed()
+        return '\n'.join(output)
@@ -0,0 +1,56 @@
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from model_i18n.translator import get_registered_models
+from model_i18n.bundles import translation_bundles
+from model_i18n.management.commands import get_registered_model
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--languages', dest='languages', default='',
+            help='Comma separated languages to warm, every translation '
+                 'language by default.'),
+        make_option('--bump', action='store_true', dest='bump',
+            default=False, help='Set a new bundles version first, every '
+                                'process reloads them.'),
+    )
+    help = 'Builds translation bundles of registered models with the ' \
+           'bundle option, on the translation cache backend.'
+    args = '[appname.ModelName ...]'
+
+    def handle(self, *labels, **options):
+        if labels:
+            selected = [get_registered_model(label) for label in labels]
+            for model in selected:
+                if not model._translation_model._transmeta.bundle:
+                    raise CommandError('Model "%s.%s" is not registered with '
+                                       'the bundle option'
+                                       % (model._meta.app_label,
+                                          model._meta.object_name))
+        else:
+            selected = [model for model in get_registered_models()
+                            if model._translation_model._transmeta.bundle]
+
+        languages = [code for code in options['languages'].split(',') if code]
+        invalid = set(languages).difference(dict(settings.LANGUAGES))
+        if invalid:
+            raise CommandError('Invalid languages: %s'
+                               % ', '.join(sorted(invalid)))
+
+        output = []
+        for model in sorted(selected, key=lambda model: model._meta.db_table):
+            trans_model = model._translation_model
+            master = trans_model._transmeta.master_language
+            if options['bump']:
+                translation_bundles.bump(trans_model)
+            for lang in languages or [code for code, name in settings.LANGUAGES]:
+                if lang == master:
+                    continue
+                bundle = translation_bundles.warm(trans_model, lang)
+                output.append('%s.%s %s: %d translations' % (
+                                    model._meta.app_label,
+                                    model._meta.object_name, lang, len(bundle)))
+        return '\n'.join(output)
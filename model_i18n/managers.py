@@ -1,12 +1,84 @@
 """
 Functions on this module are added to every manager on each multilingual model.
+
+Query sets built by get_query_set get the model default_language option
+applied (see ModelTranslation), master values are used unless it's set.
+The settings.LANGUAGES code of the active language is cached per thread
+while django active language doesn't change.
 """
+from threading import local
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.utils.functional import wraps
+from django.utils.translation import get_language
+
 from model_i18n.query import TransQuerySet
 from model_i18n.conf import MULTIDB_SUPPORT
 
 
-def get_query_set(self):
-    """ Adds TransQuerySet support """
+# settings.LANGUAGES codes, by code and by base language code
+LANGUAGE_CODES = dict([(code.split('-')[0], code)
+                            for code, name in reversed(settings.LANGUAGES)] +
+                      [(code, code) for code, name in settings.LANGUAGES])
+
+_local = local()
+
+
+def get_active_language():
+    """ Returns the settings.LANGUAGES code of current active language,
+    cached on current thread until the active language changes (or
+    reset_default_language is called) """
+    active = get_language()
+    cached = getattr(_local, 'language', None)
+    if cached is not None and cached[0] == active:
+        return cached[1]
+    language = active
+    if language:
+        language = LANGUAGE_CODES.get(language) or \
+                   LANGUAGE_CODES.get(language.split('-')[0])
+    _local.language = (active, language)
+    return language
+
+
+def reset_default_language(*args, **kwargs):
+    """ Drops current thread cached active language, called on every
+    request start """
+    _local.__dict__.pop('language', None)
+request_started.connect(reset_default_language,
+                        dispatch_uid='model_i18n.reset_default_language')
+
+
+def without_default_language(func):
+    """ Decorator, query sets built by managers while running `func` don't
+    get the default language applied (master values are used) """
+    def wrapper(*args, **kwargs):
+        _local.disabled = getattr(_local, 'disabled', 0) + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.disabled -= 1
+    return wraps(func)(wrapper)
+
+
+def get_query_language(model):
+    """ Returns the language applied to `model` query sets by default,
+    None if master values are used """
+    if getattr(_local, 'disabled', 0):
+        return None
+    trans_opts = model._translation_model._transmeta
+    language = trans_opts.default_language
+    if language == 'active':
+        language = get_active_language()
+    elif language == 'master':
+        return None
+    if language == trans_opts.master_language:
+        return None
+    return language
+
+
+def get_master_query_set(self):
+    """ Returns a TransQuerySet without the default language applied """
     qs = self.get_query_set_orig()
     kwargs = {'query': qs.query}
     # Pass DB attribute if multi-db support is present.
@@ -15,6 +87,25 @@ def get_query_set(self):
     return TransQuerySet(self.model, **kwargs)
 
 
-def set_language(self, language_code):
+def get_query_set(self):
+    """ Adds TransQuerySet support, with the model default language """
+    qs = self.get_master_query_set()
+    language = get_query_language(self.model)
+    if language:
+        qs = qs.set_language(language)
+    return qs
+
+
+def set_language(self, language_code, fallbacks=None):
     """ Sets the current language """
-    return self.get_query_set().set_language(language_code)
+    return self.get_master_query_set().set_language(language_code, fallbacks)
+
+
+def set_loading(self, loading):
+    """ Sets translations loading strategy """
+    return self.get_query_set().set_loading(loading)
+
+
+def prefetch_related(self, *names):
+    """ Prefetches related objects translations """
+    return self.get_query_set().prefetch_related(*names)
@@ -1,7 +1,9 @@
 from django.conf import settings
 
 from model_i18n.conf import DEFAULT_LANGUAGE_FIELD_NAME, RELATED_NAME, \
-                            DEFAULT_MASTER_FIELD_NAME, TRANSLATION_TABLE_SUFFIX
+                            DEFAULT_MASTER_FIELD_NAME, TRANSLATION_TABLE_SUFFIX, \
+                            JOIN_LOADING, ROWS_STORAGE, JSON_STORAGE, \
+                            JSON_TABLE_SUFFIX
 
 
 class ModelTranslation(object):
@@ -19,6 +21,12 @@ class ModelTranslation(object):
                   Master defined language (see master_language)
               * language code
                   Any valid language code
+            master by default. Other values are applied to every query set
+            built by the model managers, default manager included, so
+            related objects, dumpdata and serializers get translated values
+            (and a translation join on each query), use
+            objects.get_master_query_set() or
+            managers.without_default_language for master values
 
         - master_language [string]
             The language of the master model content, overrides
@@ -31,6 +39,28 @@ class ModelTranslation(object):
         - db_table [string]
             Table name which holds translation for a model, if not defined, then
             name is built using master table and TRANSLATION_TABLE_SUFFIX suffix
+            (JSON_TABLE_SUFFIX with json storage)
+
+        - storage [string]
+            How translations are stored
+              * rows
+                  A row per (master instance, language), with a column per
+                  translatable field
+              * json
+                  A single row per master instance holding every language
+                  values as a JSON object ({language: {field: value}}), read
+                  with a single join (or query) whatever the number of
+                  languages. Translated field lookups and ordering aren't
+                  supported
+            rows by default, i18n_convert_storage command moves translations
+            between them
+
+        - covering_index [bool or list]
+            Adds an index on translation table on (master, language) which
+            includes translatable fields columns (all of them if True, or the
+            given field names), so translation joins can be resolved just
+            with the index. Created after syncdb or with i18n_indexes command.
+            False by default
 
         - language_field_name [string]
             Column name which holds translation language, LANG_COLUMN_NAME by
@@ -38,26 +68,79 @@ class ModelTranslation(object):
 
         - master_field_name [string]
             Column name which holds master model pk, REL_COLUMN_NAME by default
+
+        - loading [string]
+            How querysets retrieve translations, can be overriden per queryset
+            with set_loading()
+              * join
+                  Translation table is LEFT OUTER joined once per language
+              * prefetch
+                  Master rows are fetched first, then translations for each
+                  chunk of rows are loaded with a single query
+            join by default
+
+        - fallbacks [dict]
+            Fallback languages for a language, in the form
+            {language: [fallback language, ...]}. Null translated values are
+            taken from the first fallback language with a value or from the
+            master value. With join loading, values are resolved by the
+            database. Can be overriden per queryset with set_language()
+
+        - cache [bool]
+            Load translations from the shared translation cache (see
+            MODEL_I18N_CACHE_* settings) instead of joining the translation
+            table, implies prefetch loading. False by default
+
+        - lazy_fields [bool]
+            Translatable fields are replaced by descriptors on master model
+            which resolve the current language value when read, translations
+            are kept on a single per-instance store instead of
+            <name>_<language> and <name>_master attributes. False by default
+
+        - bundle [bool]
+            Loads translations from per-language bundles holding every
+            translation of the language (see bundles module) instead of
+            the database, implies prefetch loading. Meant for small and
+            frequently read tables, needs a MODEL_I18N_CACHE_BACKEND shared
+            by every process (checked on registration, ImproperlyConfigured
+            is raised otherwise). False by default
+
+        - admin_languages_column [bool]
+            Adds a translated languages column to the model admin changelist,
+            filled with a single query for each page. False by default
     """
     # translatable fields
     fields = None
 
     # language
-    default_language = 'active'
+    default_language = 'master'
     master_language = settings.MODEL_I18N_MASTER_LANGUAGE
 
     # table
     db_table = None
+    storage = ROWS_STORAGE
+    covering_index = False
     language_field_name = DEFAULT_LANGUAGE_FIELD_NAME
     master_field_name = DEFAULT_MASTER_FIELD_NAME
 
     # master related name
     related_name = RELATED_NAME
 
+    # translations loading
+    fallbacks = None
+    loading = JOIN_LOADING
+    cache = False
+    bundle = False
+    lazy_fields = False
+
+    # admin
+    admin_languages_column = False
+
     def __init__(self, model):
         self.model = model
         # Default db_table
         if self.db_table is None:
-            self.db_table = '_'.join([ model._meta.db_table,
-                                       TRANSLATION_TABLE_SUFFIX ])
+            suffix = self.storage == JSON_STORAGE and JSON_TABLE_SUFFIX or \
+                     TRANSLATION_TABLE_SUFFIX
+            self.db_table = '_'.join([ model._meta.db_table, suffix ])
         super(ModelTranslation, self).__init__()
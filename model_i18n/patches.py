@@ -11,32 +11,97 @@ from django.db.models.sql import Query
 # django.db.models.sql which contains SQLCompiler with get_from_clause
 if MULTIDB_SUPPORT:
     from django.db.models.sql.compiler import SQLCompiler
-    get_custom_joins = lambda compiler: getattr(compiler.query,
-                                                'custom_joins', [])
+    get_query = lambda compiler: compiler.query
     GetFromClauseClass = SQLCompiler
 else:
-    get_custom_joins = lambda query: getattr(query, 'custom_joins', [])
+    get_query = lambda query: query
     GetFromClauseClass = Query
 
 # Backup django methods
 dj_clone = Query.clone
+dj_change_aliases = Query.change_aliases
 dj_get_from_clause = GetFromClauseClass.get_from_clause
 
 
 def MP_get_from_clause(self):
     """ Add custom_joins rules built by a QOuterJoins instance
-    to result from django get_from_clause method """
+    to result from django get_from_clause method, joins parameters
+    are added to the clause params. Just the first join is used for
+    each alias, joins with related tables not joined are left out. """
     result, params = dj_get_from_clause(self) # django
-    return (result + get_custom_joins(self), params)
+    params = list(params)
+    query = get_query(self)
+    seen = set()
+    for join in getattr(query, 'custom_joins', ()):
+        if join.alias not in seen:
+            seen.add(join.alias)
+            join_sql = join.as_sql(query)
+            if join_sql:
+                result.append(join_sql[0])
+                params.extend(join_sql[1])
+    return (result, params)
 
 def MP_clone(self, *args, **kwargs):
-    """ Also clone custom_joins attribute (if any) when cloning a
-    query object """
+    """ Also share custom_joins attribute (if any) when cloning a query
+    object, it's an immutable tuple so there's no need to copy it """
     query = dj_clone(self, *args, **kwargs) # django
     if hasattr(self, 'custom_joins'):
-        query.custom_joins = self.custom_joins[:]
+        query.custom_joins = self.custom_joins
     return query
 
+def MP_change_aliases(self, change_map):
+    """ Also relabel the query model table on translated columns selected
+    as extra columns (see query.AliasedSQL), their master values follow
+    the table alias on subqueries """
+    dj_change_aliases(self, change_map) # django
+    relabeled = False
+    for name, (sql, params) in self.extra.items():
+        if hasattr(sql, 'relabel'):
+            self.extra[name] = (sql.relabel(change_map), params)
+            relabeled = True
+    if relabeled: # drop cached extra_select
+        self.set_extra_mask(self.extra_select_mask)
+
 # Patch django
 Query.clone = MP_clone
+Query.change_aliases = MP_change_aliases
 GetFromClauseClass.get_from_clause = MP_get_from_clause
+
+
+###
+# Serve objects loaded by TransQuerySet.prefetch_related from related managers
+from django.db.models.fields.related import ForeignRelatedObjectsDescriptor, \
+                                           ManyRelatedObjectsDescriptor, \
+                                           ReverseManyRelatedObjectsDescriptor
+from model_i18n.conf import PREFETCHED_OBJECTS
+
+
+def prefetched_manager(get_name):
+    """ Returns a related objects descriptor __get__ method patch, the
+    manager get_query_set returns a query set with prefetched objects as
+    results cache (if `get_name(descriptor)` relation was prefetched) """
+    def patch(dj_get):
+        def MP_get(self, instance, instance_type=None):
+            manager = dj_get(self, instance, instance_type) # django
+            prefetched = instance is not None and \
+                         instance.__dict__.get(PREFETCHED_OBJECTS)
+            if prefetched and get_name(self) in prefetched:
+                qs, objects = prefetched[get_name(self)]
+                def get_query_set():
+                    result = qs
+                    if MULTIDB_SUPPORT:
+                        result = result._next_is_sticky()
+                    result = result.filter(**manager.core_filters)
+                    result._result_cache = list(objects)
+                    return result
+                manager.get_query_set = get_query_set
+            return manager
+        return MP_get
+    return patch
+
+related_name = lambda descriptor: descriptor.related.get_accessor_name()
+for descriptor, get_name in ((ForeignRelatedObjectsDescriptor, related_name),
+                             (ManyRelatedObjectsDescriptor, related_name),
+                             (ReverseManyRelatedObjectsDescriptor,
+                              lambda descriptor: descriptor.field.name)):
+    descriptor.__get__ = prefetched_manager(get_name)(descriptor.__get__)
@@ -1,18 +1,176 @@
+import copy
 import operator
+from itertools import islice
 
+from django.conf import settings
 from django.db import connection
 from django.db.models.sql import Query
+from django.db.models.sql.constants import LOOKUP_SEP, TABLE_NAME, \
+                                         LHS_ALIAS, LHS_JOIN_COL, RHS_JOIN_COL
 from django.db.models.query_utils import Q
 from django.db.models.sql.where import AND
-from django.db.models.query import QuerySet
+from django.db.models.fields import CharField, TextField
+from django.core.exceptions import FieldError
+from django.db.models.query import QuerySet, ValuesQuerySet, \
+                                    ValuesListQuerySet, CHUNK_SIZE
+from django.utils.datastructures import SortedDict
+from django.utils.tree import Node
+from django.utils import simplejson
 
-from model_i18n.conf import ATTR_BACKUP_SUFFIX, CURRENT_LANGUAGES
+from model_i18n.conf import MULTIDB_SUPPORT, JOIN_LOADING, PREFETCH_LOADING, \
+                            LOADING_STRATEGIES, TRANSLATION_VALUES, \
+                            LANGUAGE_LOOKUP_PREFIX, STATS, PREFETCHED_OBJECTS, \
+                            JSON_STORAGE, JSON_DATA_FIELD_NAME
+from model_i18n.cache import translation_cache, NOT_TRANSLATED
+from model_i18n.bundles import translation_bundles
+from model_i18n.store import TranslationStore
+from model_i18n.stats import incr, timed
 from model_i18n.utils import get_master_language
 
 
 QN = connection.ops.quote_name # quote name
 
 
+# Translation joins use positional aliases and column names so the SQL
+# text only depends on the model and the number of languages joined, the
+# language codes are passed as query parameters
+JOIN_ALIAS = 'translation_%d'
+FALLBACK_ALIAS = 'translation_%d_%d'
+JOIN_COLUMN = '%s_%d'
+# Joins for related models reached through select_related, by relation path
+# (field names joined with LOOKUP_SEP for column names, with '_' for aliases)
+RELATED_ALIAS = 'translation_%s_%d'
+RELATED_COLUMN = '%s__%s_%d'
+# Parent key selected by many-to-many prefetch queries
+PREFETCH_SOURCE = '_prefetch_source'
+# Query model table placeholder on join conditions and master columns
+LHS = '%(lhs)s'
+
+
+def related_alias(query, path):
+    """ Returns the alias of the table reached following `path` foreign
+    keys from `query` model on query joins, None if not joined """
+    alias = query.tables and query.tables[0]
+    opts = query.model._meta
+    for name in path:
+        field = opts.get_field(name)
+        join = (field.rel.to._meta.db_table, alias, field.column,
+                field.rel.get_related_field().column)
+        for candidate in query.tables:
+            data = query.alias_map[candidate]
+            if query.alias_refcount.get(candidate) and \
+               (data[TABLE_NAME], data[LHS_ALIAS], data[LHS_JOIN_COL],
+                data[RHS_JOIN_COL]) == join:
+                alias = candidate
+                break
+        else:
+            return None
+        opts = field.rel.to._meta
+    return alias
+
+
+class CustomJoin(tuple):
+    """ Custom join rule, an immutable (alias, table, condition, params,
+    join type, path) tuple. Queries keep them on a custom_joins tuple which
+    is shared (not copied) by query clones.
+
+    Joins with the query model table, or the table reached following
+    `path` (foreign key names from query model), use its alias resolved
+    when the query is compiled (select_related tables are joined then,
+    subqueries get their tables renamed). The alias replaces the %(lhs)s
+    placeholder on condition.
+    """
+    __slots__ = ()
+
+    def __new__(cls, alias, table, condition, params=(), join_type=Query.LOUTER,
+                path=()):
+        return tuple.__new__(cls, (alias, table, condition, tuple(params),
+                                   join_type, tuple(path)))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    alias = property(operator.itemgetter(0))
+    table = property(operator.itemgetter(1))
+    condition = property(operator.itemgetter(2))
+    params = property(operator.itemgetter(3))
+    join_type = property(operator.itemgetter(4))
+    path = property(operator.itemgetter(5))
+
+    def as_sql(self, query):
+        """ Returns (sql, params) for this join on `query`, None if `path`
+        table isn't joined """
+        lhs = related_alias(query, self.path)
+        if not lhs:
+            return None
+        if lhs == query.alias_map[lhs][TABLE_NAME]:
+            lhs = QN(lhs)
+        return ' %s %s AS %s ON %s' % (self.join_type, self.table, self.alias,
+                                       self.condition % {'lhs': lhs}), \
+               list(self.params)
+
+
+class AliasedSQL(unicode):
+    """ SQL expression on query model table columns (master values),
+    selected as an extra column or used on an extra where clause. The table
+    is referred as LHS on `template`, which is replaced by the table alias:
+    the table name until the query gets relabeled (subqueries get their
+    tables renamed, see patches module). """
+    def __new__(cls, template, table, alias=None):
+        alias = alias or table
+        lhs = alias == table and QN(alias) or alias
+        sql = unicode.__new__(cls, template.replace(LHS, lhs))
+        sql.template, sql.table, sql.alias = template, table, alias
+        return sql
+
+    def __reduce__(self):
+        return (AliasedSQL, (self.template, self.table, self.alias))
+
+    def relabel(self, change_map):
+        """ Returns the expression with the table alias in `change_map` """
+        return AliasedSQL(self.template, self.table,
+                          change_map.get(self.alias, self.alias))
+
+
+class AliasedWhere(object):
+    """ Extra where clause on an AliasedSQL expression, relabeled along
+    with the query where clause """
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+
+    def as_sql(self, qn=None, connection=None):
+        return self.sql, tuple(self.params)
+
+    def relabel_aliases(self, change_map, node=None):
+        self.sql = self.sql.relabel(change_map)
+
+
+class TranslatedLookup(Node):
+    """ Q objects child holding a translated field lookup where clause
+    (see TransQuerySet.translated_lookup), adds it to the query where the
+    lookup is found on Q objects tree """
+    def __init__(self, where):
+        super(TranslatedLookup, self).__init__()
+        self.where = where
+
+    def __deepcopy__(self, memodict):
+        return TranslatedLookup(copy.deepcopy(self.where, memodict))
+
+    def add_to_query(self, query, used_aliases):
+        query.where.add(copy.deepcopy(self.where), AND)
+
+
+def convert_value(field, value):
+    """ Returns `value`, selected through an SQL expression (backends
+    don't convert them as they do with columns), as `field` python value """
+    if value is None:
+        return value
+    if isinstance(value, float) and hasattr(field, 'format_number'):
+        value = field.format_number(value) # decimals are floats on SQLite
+    return field.to_python(value)
+
+
 class QOuterJoins(Q):
     """ Q operator, allows to add custom LEFT OUTER joins to query """
     JOIN_TYPE = Query.LOUTER
@@ -21,102 +179,448 @@ class QOuterJoins(Q):
         """
         Each kwargs entry describes an LEFT OUTER join rule,
         keys will be join aliases while values must be tuples
-        containing table to join with and a where like clause
-        which defines the join.
+        containing table to join with, a where like clause
+        which defines the join and the clause parameters.
 
-        kwargs = { "join_alias": ("table", "clause"),
+        kwargs = { "join_alias": ("table", "clause", [params]),
                    ... }
+
+        A fourth item can be added to join with a related table instead
+        of query model table (see CustomJoin path).
         """
         super(Q, self).__init__()
-        self.joins = kwargs
+        self.joins = dict((alias, CustomJoin(alias, rule[0], rule[1], rule[2],
+                                             self.JOIN_TYPE, rule[3:] and rule[3] or ()))
+                            for alias, rule in kwargs.iteritems())
 
     def add_to_query(self, query, used_aliases):
-        """ Build joins and add them to queries """
+        """ Adds joins to query custom_joins tuple (a new one, the
+        previous tuple may be shared with other queries), duplicated
+        aliases are dropped when the query is compiled """
         if self.joins:
-            if not hasattr(query, 'custom_joins'):
-                query.custom_joins = []
-            jtype = self.JOIN_TYPE
-            query.custom_joins += [
-                " %s %s AS %s ON %s" % (jtype, table, alias, where)
-                    for alias, (table, where) in self.joins.iteritems()
-                        if alias not in used_aliases ]
+            query.custom_joins = getattr(query, 'custom_joins', ()) + \
+                                 tuple([join for alias, join in sorted(self.joins.iteritems())
+                                            if alias not in used_aliases])
 
     def __and__(self, right):
-        """ AND operator. Useful to setup several joins rules """
+        """ AND operator. Useful to setup several joins rules, returns a
+        new object with both operands joins """
         if not isinstance(right, QOuterJoins):
             return super(QOuterJoins, self).__and__(right)
-        self.joins.update(right.joins)
-        return self
+        clone = copy.copy(self)
+        clone.joins = dict(self.joins)
+        clone.joins.update(right.joins)
+        return clone
+
+
+class TransJoinTemplate(object):
+    """ Translation join SQL fragments for a model. Fragments don't change
+    once the model is registered, so they are compiled by the translator
+    at register time (for as many positions as settings.LANGUAGES) and
+    reused by every TransJoin.
+    """
+    def __init__(self, model, positions=0):
+        """ Init method.
+        Args:
+            model: translatable model
+            positions: number of join positions to compile
+        """
+        trans_model = model._translation_model
+        trans_opts = trans_model._transmeta
+        get_column = lambda name: trans_model._meta.get_field(name).column
+
+        self.table = trans_model._meta.db_table
+        self.master_table = model._meta.db_table
+        # master table alias is only known when the query is compiled (see
+        # CustomJoin), it's the same condition for related joins
+        self.where = ('%(m_table)s.%(m_pk)s = %%(alias)s.%(t_fk)s %(and)s '
+                      '%%(alias)s.%(t_lang)s = %%%%s' % {
+                         'm_table': LHS.replace('%', '%%'),
+                         'm_pk': QN(model._meta.pk.column),
+                         'and': AND,
+                         't_fk': QN(get_column(trans_opts.master_field_name)),
+                         't_lang': QN(get_column(trans_opts.language_field_name))
+                      }).replace('%%s', '%%%%s')
+        # master table is referred as LHS too on master columns
+        self.columns = [('id', QN(trans_model._meta.pk.column), None)] + \
+                       [(name, QN(get_column(name)), '%s.%s' % (LHS,
+                            QN(model._meta.get_field(name).column)))
+                                for name in trans_opts.translatable_fields]
+        self.width = len(self.columns)
+        # values selected through COALESCE (fallbacks) aren't converted by
+        # backends, (store position, field) of the fields converted on load
+        self.converted = [(index + 1, field) for index, field in
+                            enumerate([model._meta.get_field(name) for name in
+                                        trans_opts.translatable_fields])
+                                if not isinstance(field, (CharField, TextField))]
+        self.fragments = {}
+        self._joined_columns = {}
+        for position in range(positions):
+            self.get(position)
+
+    def compile(self, position, fallbacks):
+        """ Returns (joins, select) fragments for `position` where joins is
+        a list of (alias, where) tuples, the first one for the position
+        language followed by one for each fallback language. Each where
+        has a placeholder for its language.
+
+        With fallbacks, translatable fields are selected as the first non
+        null value of position language, fallback languages (in order)
+        and master value.
+        """
+        alias = JOIN_ALIAS % position
+        aliases = [alias] + [FALLBACK_ALIAS % (position, index)
+                                for index in range(fallbacks)]
+        select = SortedDict()
+        for name, column, master_column in self.columns:
+            if fallbacks and master_column:
+                value = AliasedSQL('COALESCE(%s, %s)' % (
+                                        ', '.join(['%s.%s' % (QN(a), column)
+                                                    for a in aliases]),
+                                        master_column), self.master_table)
+            else:
+                value = '%s.%s' % (QN(alias), column)
+            select[JOIN_COLUMN % (name, position)] = value
+        joins = [(a, self.where % {'alias': a}) for a in aliases]
+        return joins, select
+
+    def compile_related(self, path, position, fallbacks):
+        """ Returns (joins, select) fragments like compile does, for
+        `position` on a related model reached through `path` foreign keys.
+        Master values aren't selected as the last fallback, related
+        instances keep them as usual. """
+        alias = RELATED_ALIAS % ('_'.join(path), position)
+        aliases = [alias] + ['%s_%d' % (alias, index)
+                                for index in range(fallbacks)]
+        select = SortedDict()
+        for name, column, master_column in self.columns:
+            if fallbacks and master_column:
+                value = 'COALESCE(%s)' % ', '.join(['%s.%s' % (QN(a), column)
+                                                        for a in aliases])
+            else:
+                value = '%s.%s' % (QN(alias), column)
+            select[RELATED_COLUMN % (LOOKUP_SEP.join(path), name, position)] = value
+        joins = [(a, self.where % {'alias': a}) for a in aliases]
+        return joins, select
+
+    def get(self, position, fallbacks=0, path=()):
+        """ Returns fragments for `position` with `fallbacks` fallback
+        languages (for `path` related model if given), compiling them if
+        missing """
+        try:
+            return self.fragments[(position, fallbacks, path)]
+        except KeyError:
+            if path:
+                fragments = self.compile_related(path, position, fallbacks)
+            else:
+                fragments = self.compile(position, fallbacks)
+            self.fragments[(position, fallbacks, path)] = fragments
+            return fragments
+
+    def joined_columns(self, count, path=()):
+        """ Returns selected column names for `count` joins (of `path`
+        related model if given), in order """
+        try:
+            return self._joined_columns[(count, path)]
+        except KeyError:
+            names = []
+            for position in range(count):
+                names.extend(self.get(position, path=path)[1].keys())
+            self._joined_columns[(count, path)] = names
+            return names
+
+    def params(self, language):
+        """ Returns join condition parameters for `language` """
+        return [language]
+
+
+class JsonJoinTemplate(TransJoinTemplate):
+    """ Translation join SQL fragments for models with json storage. Every
+    language is kept on the same translation row, so a single join (first
+    position) selects translation pk and JSON data whatever the number of
+    languages, other positions don't add anything. Values and fallbacks
+    are resolved by TransQuerySet (see decode_translations). """
+    def __init__(self, model, positions=0):
+        trans_model = model._translation_model
+        trans_opts = trans_model._transmeta
+        get_column = lambda name: trans_model._meta.get_field(name).column
+
+        self.table = trans_model._meta.db_table
+        self.where = '%(m_table)s.%(m_pk)s = %%(alias)s.%(t_fk)s' % {
+                         'm_table': LHS.replace('%', '%%'),
+                         'm_pk': QN(model._meta.pk.column),
+                         't_fk': QN(get_column(trans_opts.master_field_name)) }
+        self.columns = [('id', QN(trans_model._meta.pk.column)),
+                        (JSON_DATA_FIELD_NAME, QN(get_column(JSON_DATA_FIELD_NAME)))]
+        # translations store layout doesn't change
+        self.width = len(trans_opts.translatable_fields) + 1
+        self.converted = () # JSON values are converted when decoded
+        self.fragments = {}
+        self._joined_columns = {}
+        if positions:
+            self.get(0)
+
+    def compile(self, position, fallbacks):
+        """ Returns (joins, select) fragments, empty but for first
+        position. Fallbacks don't change them. """
+        if position:
+            return [], SortedDict()
+        alias = JOIN_ALIAS % position
+        select = SortedDict([(JOIN_COLUMN % (name, position),
+                              '%s.%s' % (QN(alias), column))
+                                for name, column in self.columns])
+        return [(alias, self.where % {'alias': alias})], select
+
+    def compile_related(self, path, position, fallbacks):
+        """ Returns (joins, select) fragments like compile does, for a
+        related model reached through `path` foreign keys """
+        if position:
+            return [], SortedDict()
+        alias = RELATED_ALIAS % ('_'.join(path), position)
+        select = SortedDict([(RELATED_COLUMN % (LOOKUP_SEP.join(path), name,
+                                                position),
+                              '%s.%s' % (QN(alias), column))
+                                for name, column in self.columns])
+        return [(alias, self.where % {'alias': alias})], select
+
+    def params(self, language):
+        """ Join condition doesn't depend on language """
+        return []
 
 
 class TransJoin(QOuterJoins):
     """Q Object which joins translation table and retrieves translatable
     attributes for selected language. Delegates join to QOuterJoins"""
 
-    def __init__(self, model, lang):
+    def __init__(self, model, lang, position=0, fallbacks=(), path=()):
         """ Init method.
         Args:
             model: translatable model
             lang: language desired
+            position: join position on query, used to build the join alias
+                      and selected columns names
+            fallbacks: languages used (in order) when `lang` value is null,
+                       master value is used last
+            path: foreign key names from query model to `model` when
+                  joining a select_related model
         """
         self.model = model
 
-        trans_model = model._translation_model
-        trans_opts = trans_model._transmeta
-
-        alias = 'translation_%s' % lang
-        self.data = { alias: lang }
-
-        # Join data
-        related_col  = trans_opts.master_field_name
-        trans_table  = trans_model._meta.db_table
-        trans_fk     = trans_model._meta.get_field(related_col).column
-        master_table = model._meta.db_table
-        master_pk    = model._meta.pk.column
-
-        where = '%(m_table)s.%(m_pk)s = %(alias)s.%(t_fk)s %(and)s '\
-                '%(alias)s.%(t_lang)s = "%(lang)s"' % {
-                    'm_table': QN(master_table),
-                    'm_pk':  QN(master_pk),
-                    'and': AND,
-                    'alias': alias,
-                    't_fk': QN(trans_fk),
-                    't_lang': QN(trans_opts.language_field_name),
-                    'lang': lang }
-        super(TransJoin, self).__init__(**{ alias: (trans_table, where) })
+        template = model._translation_model._transmeta.join_template
+        joins, select = template.get(position, len(fallbacks), path)
+        self.data = joins and { joins[0][0]: select } or {}
+        super(TransJoin, self).__init__(**dict(
+            (alias, (template.table, where, template.params(language), path))
+                for (alias, where), language in zip(joins,
+                                                    [lang] + list(fallbacks))))
 
     def add_to_query(self, query, used_aliases):
         """
         Delegates join to QOuterJoins and adds the needed fields to 
         select list. The translateable fields will be in the form:
-            <master model attribute name>_<language code>.
-        Also current_languages attribute will be added with translation
-        language codes joined by '_'.
+            <master model attribute name>_<join position>.
         """
         # resolve joins
         super(TransJoin, self).add_to_query(query, used_aliases)
-        trans_pk = QN(self.model._translation_model._meta.pk.column)
-        fields = self.model._translation_model._transmeta.translatable_fields
-
         # add joined columns needed
-        select = {}
-        for alias, lang in self.data.iteritems():
-            alias = QN(alias)
-            select['id_%s' % lang] = '%s.%s' % (alias, trans_pk)
-            select.update(('%s_%s' % (name, lang),
-                           '%s.%s' % (alias, QN(name)))
-                                for name in fields)
-        select[CURRENT_LANGUAGES] = '"%s"' % '_'.join(self.data.itervalues())
-        query.add_extra(select, None, None, None, None, None)
+        for alias, select in sorted(self.data.iteritems()):
+            query.add_extra(select, None, None, None, None, None)
 
     def __and__(self, right):
         """ AND operator, useful to request more than one language
         in a single query:
             TransJoin(...) & TransJoin(...)
         """
-        if isinstance(right, TransJoin) and self.model == right.model:
-            self.data.update(right.data)
-        return super(TransJoin, self).__and__(right)
+        clone = super(TransJoin, self).__and__(right)
+        if isinstance(right, TransJoin):
+            clone.data = dict(self.data)
+            clone.data.update(right.data)
+        return clone
+
+
+def fetch_translations(model, pks, languages, using=None):
+    """ Loads translations for `pks` master instances on `languages` in a
+    single query. Returns a {(pk, language): value} dict where values are
+    tuples in the form (translation pk, field value, ...) following
+    translatable_fields order.
+    """
+    trans_model = model._translation_model
+    trans_opts = trans_model._transmeta
+    master = trans_opts.master_field_name
+    if trans_opts.storage == JSON_STORAGE:
+        qs = trans_model._default_manager.filter(**{'%s__in' % master: pks})
+        if MULTIDB_SUPPORT and using:
+            qs = qs.using(using)
+        return decode_translations(model, qs.values_list(master, 'pk',
+                                                         JSON_DATA_FIELD_NAME),
+                                   languages)
+    lang = trans_opts.language_field_name
+    qs = trans_model._default_manager.filter(**{'%s__in' % master: pks,
+                                                '%s__in' % lang: languages})
+    if MULTIDB_SUPPORT and using:
+        qs = qs.using(using)
+    rows = qs.values_list(master, lang, 'pk', *trans_opts.translatable_fields)
+    return dict(((row[0], row[1]), row[2:]) for row in rows)
+
+
+def decode_translations(model, rows, languages):
+    """ Returns `languages` translations on json storage `rows` of (master
+    pk, translation pk, JSON data) as fetch_translations does. JSON data
+    is an object in the form {language: {field name: value}}, values are
+    converted by `model` fields. """
+    fields = [model._meta.get_field(name) for name in
+                model._translation_model._transmeta.translatable_fields]
+    values = {}
+    for pk, trans_pk, data in rows:
+        if not data:
+            continue
+        data = simplejson.loads(data)
+        for lang in languages:
+            translated = data.get(lang)
+            if translated is None:
+                continue
+            values[(pk, lang)] = (trans_pk,) + tuple([
+                    field.to_python(translated[field.name])
+                        if translated.get(field.name) is not None else None
+                            for field in fields])
+    return values
+
+
+def apply_fallbacks(values, pk, lang, fallbacks):
+    """ Returns `lang` value for `pk` on {(pk, language): value} `values`
+    with null fields taken from `fallbacks` languages values (in order).
+    Translation pk is always the `lang` one. """
+    value = values.get((pk, lang))
+    for fallback in fallbacks:
+        if value and None not in value:
+            break
+        other = values.get((pk, fallback))
+        if not other:
+            continue
+        elif not value:
+            value = (None,) + other[1:]
+        else:
+            value = value[:1] + tuple([other_value if current is None else current
+                                        for current, other_value in zip(value[1:],
+                                                                        other[1:])])
+    return value
+
+
+def store_values(values, pk, languages, fallbacks, width):
+    """ Returns `pk` values for `languages` (in order) with the
+    translations store layout, from {(pk, language): value} `values` with
+    `fallbacks` ({language: fallback languages}) applied """
+    empty = (None,) * width
+    row = ()
+    for lang in languages:
+        row += apply_fallbacks(values, pk, lang, fallbacks[lang]) or empty
+    return row
+
+
+def get_related(instance, path):
+    """ Returns the related instance cached by select_related following
+    `path` foreign keys from `instance`, None if any of them is null """
+    for name in path:
+        field = instance._meta.get_field(name)
+        instance = instance.__dict__.get(field.get_cache_name())
+        if instance is None:
+            return None
+    return instance
+
+
+def get_relation(model, name):
+    """ Returns (related model, lookup, key, source, select) for `name`
+    reverse foreign key or many-to-many relation (forward or reverse) of
+    `model`, where lookup filters related objects by `key` attribute values
+    of `model` instances, and the `key` of each related object is its
+    `source` attribute or the `select` extra select (many-to-many) """
+    opts = model._meta
+    for field in opts.many_to_many:
+        if field.name == name:
+            return (field.rel.to, '%s__in' % field.related_query_name(),
+                    opts.pk.attname, None,
+                    '%s.%s' % (QN(field.m2m_db_table()),
+                               QN(field.m2m_column_name())))
+    for related in opts.get_all_related_many_to_many_objects():
+        if related.get_accessor_name() == name:
+            field = related.field
+            return (related.model, '%s__in' % field.name,
+                    opts.pk.attname, None,
+                    '%s.%s' % (QN(field.m2m_db_table()),
+                               QN(field.m2m_reverse_name())))
+    for related in opts.get_all_related_objects():
+        if related.get_accessor_name() == name:
+            field = related.field
+            return (related.model, '%s__in' % field.name,
+                    field.rel.get_related_field().attname, field.attname, None)
+    raise FieldError('Cannot prefetch "%s", not a reverse foreign key or '
+                     'many-to-many relation of %s' % (name, opts.object_name))
+
+
+def set_translations(instance, languages, values, language=None):
+    """ Attaches a translations store with `values` for `languages` to
+    `instance` and switches it to `language` if loaded """
+    trans_opts = instance._translation_model._transmeta
+    if trans_opts.lazy_fields:
+        master = None
+    else:
+        master = tuple([instance.__dict__.get(name)
+                            for name in trans_opts.translatable_fields])
+    instance.__dict__[TRANSLATION_VALUES] = TranslationStore(
+                                                languages, values,
+                                                trans_opts.join_template.width,
+                                                master)
+    if language and language in languages:
+        instance.switch_language(language)
+    return instance
+
+
+def load_bundle_language(instance, language):
+    """ Adds `language` values (fallbacks included) from the model bundles
+    to `instance` translations store, returns the store """
+    trans_model = instance._translation_model
+    trans_opts = trans_model._transmeta
+    fallbacks = tuple([lang for lang in trans_opts.fallbacks.get(language, ())
+                            if lang not in (language, trans_opts.master_language)])
+    values = translation_bundles.get_many(trans_model, [instance.pk],
+                                          (language,) + fallbacks)
+    value = apply_fallbacks(values, instance.pk, language, fallbacks) or \
+            (None,) * trans_opts.join_template.width
+    store = instance.__dict__.get(TRANSLATION_VALUES)
+    if store is None:
+        return set_translations(instance, [language], value)\
+                    .__dict__[TRANSLATION_VALUES]
+    # languages list is shared by other instances, a new store is needed
+    current = store.current
+    store = TranslationStore(store.languages + [language],
+                             store.values + value, store.width, store.master)
+    store.current = current
+    instance.__dict__[TRANSLATION_VALUES] = store
+    return store
+
+
+def lookup_sql(field, column, lookup_type, value):
+    """ Returns (where, params) for a `lookup_type` lookup on `column`
+    SQL expression, values are prepared by translation model `field` """
+    if lookup_type == 'exact' and value is None:
+        lookup_type, value = 'isnull', True
+    if lookup_type == 'isnull':
+        return '%s IS %sNULL' % (column, not value and 'NOT ' or ''), []
+
+    if MULTIDB_SUPPORT:
+        params = field.get_db_prep_lookup(lookup_type, value,
+                                          connection=connection)
+    else:
+        params = field.get_db_prep_lookup(lookup_type, value)
+    column = connection.ops.lookup_cast(lookup_type) % column
+    if lookup_type in connection.operators:
+        return '%s %s' % (column, connection.operators[lookup_type]), params
+    elif lookup_type == 'in':
+        return '%s IN (%s)' % (column, ', '.join(['%s'] * len(params))), params
+    elif lookup_type == 'range':
+        return '%s BETWEEN %%s AND %%s' % column, params
+    raise FieldError('Unsupported lookup "%s" on translated field "%s"'
+                     % (lookup_type, field.name))
 
 
 class TransQuerySet(QuerySet):
@@ -124,20 +628,75 @@ class TransQuerySet(QuerySet):
     QuerySet that joins with translation table, retrieves translated
     values and setup model attributes
     """
+    decoded = None # values decoded from JSON data, see translated_values
+    converted = () # values converted on results, see translated_values
+
     def __init__(self, *args, **kwargs):
         self.languages = set()
+        self.joined = [] # joined languages, in join position order
         self.lang = None
+        self.loading = None
+        self.fallbacks = {} # fallbacks overrides, language -> languages
+        self.filtered = frozenset() # languages used by translated lookups
+        self.related = () # (path, model) for select_related translatable models
+        self.prefetched = () # prefetch_related relation names
         super(TransQuerySet, self).__init__(*args, **kwargs)
 
-    def set_language(self, language):
+    def set_language(self, language, fallbacks=None):
         """ Defines/switch query set implicit language, attributes on
         result instances will be switched to this language on change_fields
+
+        `fallbacks` languages are used (in order) for `language` null
+        values, overrides model translation fallbacks option. Must be set
+        before `language` gets requested.
+        """
+        qs = self
+        if fallbacks is not None:
+            qs = self._clone()
+            qs.fallbacks = dict(self.fallbacks)
+            qs.fallbacks[language] = tuple(fallbacks)
+        return qs.get_translations([language], language)
+
+    def get_fallbacks(self, language, model=None):
+        """ Returns fallback languages for `language` (on `model`, query
+        set model by default), master language is left out (master value
+        is always the last fallback) """
+        model = model or self.model
+        if language in self.fallbacks:
+            fallbacks = self.fallbacks[language]
+        else:
+            fallbacks = model._translation_model._transmeta\
+                             .fallbacks.get(language, ())
+        master = get_master_language(model)
+        return tuple([lang for lang in fallbacks
+                        if lang not in (language, master)])
+
+    def set_loading(self, loading):
+        """ Defines translations loading strategy for this query set,
+        overrides model translation loading option. Languages already
+        requested are joined if switching to join loading.
         """
-        return self.get_translations([language], language)
+        if loading not in LOADING_STRATEGIES:
+            raise ValueError('Unknown translations loading "%s"' % loading)
+        clone = self._clone()
+        clone.loading = loading
+        if loading == JOIN_LOADING and clone.languages.difference(clone.joined):
+            clone = clone.join_translations(clone.languages.difference(clone.joined))
+        return clone
+
+    def get_loading(self):
+        """ Returns the loading strategy used by this query set """
+        trans_opts = self.model._translation_model._transmeta
+        if self.loading:
+            return self.loading
+        elif trans_opts.cache or trans_opts.bundle:
+            return PREFETCH_LOADING
+        return trans_opts.loading
 
     def get_translations(self, languages, language=None):
         """ Adds any non-master new languages in parameter to requested
         languages list (self.languages) and build the new query joins rules
+        (just with join loading)
 
         We do not do anything if no new languages were passed
 
@@ -152,48 +711,684 @@ class TransQuerySet(QuerySet):
         new = set((lang for lang in languages
                         if lang and lang != master)) - self.languages
 
-        if language not in (self.lang, master): # set implicit language
-            self.lang = language
+        if new and self.get_loading() == JOIN_LOADING:
+            clone = self.join_translations(new)
+        else: # prefetched languages are loaded on iterator
+            clone = self._clone()
+        clone.languages |= new
+
+        if language and language not in (self.lang, master): # set implicit language
+            clone.lang = language
+        return clone
+
+    @timed('query_build')
+    def join_translations(self, languages):
+        """ Returns a clone joined with translation table for each
+        language in `languages`, joins are positioned after the ones
+        already in the query """
+        start = len(self.joined)
+        languages = sorted(languages)
+        rules = [ TransJoin(self.model, lang, start + index,
+                            self.get_fallbacks(lang))
+                    for index, lang in enumerate(languages) ] + \
+                self.related_joins(self.related, languages, start)
+        join = reduce(operator.and_, rules) if len(rules) > 1 else rules[0]
+        clone = self.filter(join)
+        clone.joined = self.joined + languages
+        return clone
+
+    def related_joins(self, related, languages, start=0):
+        """ Returns translation joins for `languages` on `related` (path,
+        model) select_related models, positioned from `start` """
+        return [ TransJoin(model, lang, start + index,
+                           self.get_fallbacks(lang, model), path)
+                    for path, model in related
+                        for index, lang in enumerate(languages) ]
+
+    def related_models(self, opts=None, path=(), requested=None, depth=1):
+        """ Returns (path, model) tuples for translatable models followed
+        by query select_related, the same way django does: foreign keys on
+        select_related fields if given, non null foreign keys up to query
+        max_depth otherwise. Inherited foreign keys aren't followed. """
+        query = self.query
+        if opts is None:
+            opts = self.model._meta
+            if isinstance(query.select_related, dict):
+                requested = query.select_related
+        if requested is None and query.max_depth and depth > query.max_depth:
+            return []
+        related = []
+        for field in opts.local_fields:
+            if not field.rel or getattr(field.rel, 'parent_link', False):
+                continue
+            if requested is not None and field.name not in requested:
+                continue
+            if requested is None and field.null:
+                continue
+            model = field.rel.to
+            if hasattr(model, '_translation_model'):
+                related.append((path + (field.name,), model))
+            related.extend(self.related_models(model._meta, path + (field.name,),
+                                               requested and requested[field.name],
+                                               depth + 1))
+        return related
 
-        if new: # if there's any language to add
-            rules = [ TransJoin(self.model, lang) for lang in new ]
-            join = reduce(operator.and_, rules) if len(rules) > 1 else rules[0]
-            self.languages |= new
-            return self.filter(join)
-        return self
+    def select_related(self, *fields, **kwargs):
+        """ select_related override, related instances of translatable
+        models are translated too. Their translations are joined (at the
+        same positions than query set languages) or prefetched as query
+        set languages are. """
+        clone = super(TransQuerySet, self).select_related(*fields, **kwargs)
+        related = tuple([item for item in clone.related_models()
+                            if item not in self.related])
+        if not related:
+            return clone
+        clone.related = self.related + related
+        if clone.joined:
+            rules = clone.related_joins(related, clone.joined)
+            clone = clone.filter(reduce(operator.and_, rules))
+        return clone
+
+    def translation_columns(self):
+        """ Returns names of the columns selected by translation joins,
+        select_related models ones included """
+        count = len(self.joined)
+        columns = self.model._translation_model._transmeta.join_template\
+                            .joined_columns(count)
+        for path, model in self.related:
+            columns = columns + model._translation_model._transmeta\
+                                     .join_template.joined_columns(count, path)
+        return columns
+
+    def parse_lookup(self, lookup):
+        """ Parses translated field lookups in the form
+            <field>__lang_<language>[__<lookup type>]
+        returns (field name, language, lookup parts) or None if `lookup`
+        isn't a translated field lookup. Dashes on language codes can be
+        written as underscores (title__lang_pt_br). """
+        parts = lookup.split(LOOKUP_SEP)
+        if len(parts) < 2 or not parts[1].startswith(LANGUAGE_LOOKUP_PREFIX):
+            return None
+        trans_opts = self.model._translation_model._transmeta
+        if parts[0] not in trans_opts.translatable_fields:
+            return None
+        if trans_opts.storage == JSON_STORAGE:
+            raise FieldError('Translated field lookups are not supported by '
+                             'json storage, "%s"' % lookup)
+        code = parts[1][len(LANGUAGE_LOOKUP_PREFIX):]
+        for language, name in settings.LANGUAGES:
+            if code in (language, language.replace('-', '_')):
+                return parts[0], language, parts[2:]
+        raise FieldError('Unknown language "%s" on lookup "%s"' % (code, lookup))
+
+    def require_join(self, language):
+        """ Returns a clone joined with `language` translations (even if
+        prefetch loading is used) """
+        if language in self.joined:
+            return self
+        clone = self.join_translations([language])
+        clone.languages.add(language)
+        return clone
+
+    def translated_column(self, name, language):
+        """ SQL expression for `name` translated value on a joined
+        `language`, fallbacks included """
+        column = JOIN_COLUMN % (name, self.joined.index(language))
+        return self.query.extra_select[column][0]
+
+    def translated_lookup(self, key, value):
+        """ Resolves `key` translated field lookup (see parse_lookup) as a
+        TranslatedLookup where clause on the translation join. Returns the
+        query set joined with the lookup language and the lookup, other
+        lookups are returned as (key, value) """
+        parsed = self.parse_lookup(key)
+        if parsed is None:
+            return self, (key, value)
+        name, language, lookup = parsed
+        if language == get_master_language(self.model):
+            # master value, let django handle it
+            return self, (LOOKUP_SEP.join([name] + lookup), value)
+        if len(lookup) > 1:
+            raise FieldError('Unsupported lookup "%s"' % key)
+        field = self.model._translation_model._meta.get_field(name)
+        lookup_type = lookup and lookup[0] or 'exact'
+        clone = self.require_join(language)._clone()
+        column = clone.translated_column(name, language)
+        column = getattr(column, 'template', column)
+        where, params = lookup_sql(field, column, lookup_type, value)
+        if lookup_type != 'isnull' and value is not None:
+            # null (not translated) values don't match, so negated lookups
+            # keep them like django does
+            where = '(%s AND %s IS NOT NULL)' % (where, column)
+        clone.filtered = clone.filtered | frozenset([language])
+        where = AliasedSQL(where, self.model._meta.db_table)
+        return clone, TranslatedLookup(AliasedWhere(where, params))
+
+    def translate_q(self, q):
+        """ Returns (query set, Q object) with translated field lookups on
+        `q` tree resolved (see translated_lookup) """
+        clone, children = self, []
+        for child in q.children:
+            if not isinstance(child, Node):
+                clone, child = clone.translated_lookup(*child)
+            elif not hasattr(child, 'add_to_query'): # joins add themselves
+                clone, child = clone.translate_q(child)
+            children.append(child)
+        q = copy.copy(q)
+        q.children = children
+        return clone, q
+
+    def filter(self, *args, **kwargs):
+        """ Adds translated field lookups support (see parse_lookup), on
+        keyword arguments and Q objects """
+        if not args and not kwargs:
+            return super(TransQuerySet, self).filter()
+        clone, q = self.translate_q(Q(*args, **kwargs))
+        return super(TransQuerySet, clone).filter(q)
+
+    def exclude(self, *args, **kwargs):
+        """ Adds translated field lookups support (see parse_lookup), on
+        keyword arguments and Q objects """
+        if not args and not kwargs:
+            return super(TransQuerySet, self).exclude()
+        clone, q = self.translate_q(Q(*args, **kwargs))
+        return super(TransQuerySet, clone).exclude(q)
+
+    def complex_filter(self, filter_obj):
+        """ complex_filter override, Q objects are added by filter """
+        if isinstance(filter_obj, Q) and not hasattr(filter_obj, 'add_to_query'):
+            return self.filter(filter_obj)
+        return super(TransQuerySet, self).complex_filter(filter_obj)
+
+    def update(self, **kwargs):
+        """ update override, UPDATE statements don't get translation joins
+        so with translated field lookups the matching rows are updated by
+        pk (by chunks) """
+        if not self.filtered:
+            return super(TransQuerySet, self).update(**kwargs)
+        pks = list(self.values_list('pk', flat=True))
+        qs = QuerySet(self.model)
+        if MULTIDB_SUPPORT:
+            qs = qs.using(self.db)
+        rows = 0
+        for start in range(0, len(pks), CHUNK_SIZE):
+            rows += qs.filter(pk__in=pks[start:start + CHUNK_SIZE])\
+                      .update(**kwargs)
+        return rows
+    update.alters_data = True
+
+    def order_by(self, *field_names):
+        """ Adds ordering by translated values in the form
+        <field>__lang_<language>, fallbacks included """
+        master = get_master_language(self.model)
+        clone, ordering = self, []
+        for field_name in field_names:
+            prefix = field_name.startswith('-') and '-' or ''
+            parsed = self.parse_lookup(field_name.lstrip('-'))
+            if parsed is None:
+                ordering.append(field_name)
+                continue
+            name, language, lookup = parsed
+            if lookup:
+                raise FieldError('Invalid order_by arguments: %s' % field_name)
+            if language == master:
+                ordering.append(prefix + name)
+            else:
+                clone = clone.require_join(language)
+                ordering.append(prefix + JOIN_COLUMN %
+                                        (name, clone.joined.index(language)))
+        return super(TransQuerySet, clone).order_by(*ordering)
 
     def iterator(self):
         """ Invokes QuerySet iterator method and tries to change instance
-        attributes with translated values if any translation was retrieved
+        attributes with translated values if any translation was retrieved,
+        languages not joined are loaded by chunks of master instances
         """
-        for obj in super(TransQuerySet, self).iterator():
-            yield self.change_fields(obj)
+        objects = super(TransQuerySet, self).iterator()
+        prefetch = sorted(self.languages.difference(self.joined))
+        languages = self.joined + prefetch
+        if STATS:
+            incr('queries')
+            incr('languages_joined', len(self.joined))
+            incr('languages_prefetched', len(prefetch))
+        if not prefetch and not self.prefetched:
+            for obj in objects:
+                yield self.change_fields(obj, languages)
+            return
+
+        while True:
+            chunk = list(islice(objects, CHUNK_SIZE))
+            if not chunk:
+                break
+            if prefetch:
+                loaded = self.load_translations(chunk, prefetch)
+                related = zip(*[self.load_related(chunk, path, model, prefetch)
+                                    for path, model in self.related])
+            else:
+                loaded, related = [()] * len(chunk), None
+            related = related or [None] * len(chunk)
+            chunk = [self.change_fields(obj, languages, values, related_values)
+                        for obj, values, related_values in zip(chunk, loaded,
+                                                               related)]
+            for name in self.prefetched:
+                self.prefetch_relation(chunk, name)
+            for obj in chunk:
+                yield obj
 
-    def change_fields(self, instance):
-        """Here we backups master values in <name>_<ATTR_BACKUP_SUFFIX>
-        and overrides the default fields with their translated values using
-        instance set_language.
+    def prefetch_related(self, *names):
+        """ Returns a clone which loads `names` reverse foreign key and
+        many-to-many related objects of each results chunk with a query per
+        relation (plus prefetched translations). Related objects of
+        registered models are translated to this query set languages,
+        implicit language and fallbacks included. They're returned by the
+        relation manager all() (see patches module), other methods query
+        the database as usual. """
+        for name in names:
+            get_relation(self.model, name) # check relation
+        clone = self._clone()
+        clone.prefetched = self.prefetched + tuple([name for name in names
+                                                        if name not in self.prefetched])
+        return clone
+
+    def related_query_set(self, model):
+        """ Returns `model` default manager query set, with this query
+        set languages (instead of the default one) if `model` is registered """
+        manager = model._default_manager
+        if hasattr(manager, 'get_master_query_set'):
+            qs = manager.get_master_query_set()
+        else:
+            qs = manager.get_query_set()
+        if isinstance(qs, TransQuerySet) and self.languages:
+            qs = qs._clone()
+            qs.fallbacks = self.fallbacks
+            qs = qs.get_translations(sorted(self.languages), self.lang)
+        return qs
+
+    def prefetch_relation(self, instances, name):
+        """ Loads `name` related objects of `instances` with a single
+        query and caches them on each instance (see prefetch_related) """
+        model, lookup, key, source, select = get_relation(self.model, name)
+        qs = self.related_query_set(model)
+        keys = set([getattr(obj, key) for obj in instances])
+        keys.discard(None)
+        objects = {}
+        if keys:
+            rows = qs.filter(**{lookup: list(keys)})
+            if select:
+                rows = rows.extra(select={PREFETCH_SOURCE: select})
+            for obj in rows:
+                if select:
+                    value = obj.__dict__.pop(PREFETCH_SOURCE)
+                else:
+                    value = getattr(obj, source)
+                objects.setdefault(value, []).append(obj)
+        for obj in instances:
+            obj.__dict__.setdefault(PREFETCHED_OBJECTS, {})[name] = \
+                (qs, objects.get(getattr(obj, key), []))
+
+    def load_related(self, instances, path, model, languages):
+        """ Loads translated values for `path` select_related instances
+        of `instances` (see load_translations), empty for null relations """
+        related = [get_related(obj, path) for obj in instances]
+        found = [obj for obj in related if obj is not None]
+        loaded = iter(found and self.load_translations(found, languages, model))
+        values = []
+        for obj in related:
+            if obj is None:
+                values.append(())
+            else:
+                values.append(loaded.next())
+        return values
+
+    def load_translations(self, instances, languages, model=None):
+        """ Loads translated values of `instances` for `languages`, null
+        values are taken from fallback languages if any.
+        Translations are loaded with a single query, from translation cache
+        first if model translation cache option is enabled, or from the
+        model bundles (no query) if bundle option is enabled.
+
+        `model` is the instances model, query set model by default.
+        Returns a tuple of values for each instance, with the layout used by
+        the translations store.
         """
-        trans_opts = instance._translation_model._transmeta
-
-        # backup master value on <name>_<suffix> attribute
-        apply(lambda name: setattr(instance,
-                                   '_'.join((name, ATTR_BACKUP_SUFFIX)),
-                                   getattr(instance, name, None)),
-               trans_opts.translatable_fields)
-
-        languages = filter(None, getattr(instance,
-                                         CURRENT_LANGUAGES, '').split('_'))
-        implicit = self.lang
-        if implicit and implicit in languages:
-            instance.switch_language(implicit) # switch to implicit language
-        setattr(instance, CURRENT_LANGUAGES, languages)
-        return instance
-
-    def _clone(self, *args, **kwargs):
+        model = model or self.model
+        trans_model = model._translation_model
+        trans_opts = trans_model._transmeta
+        pks = [obj.pk for obj in instances]
+        fallbacks, needed = self.needed_languages(languages, model)
+
+        if trans_opts.bundle:
+            values = translation_bundles.get_many(trans_model, pks, needed)
+        elif trans_opts.cache:
+            values = translation_cache.get_many(trans_model, pks, needed)
+            missing = [(pk, lang) for pk in pks for lang in needed
+                            if (pk, lang) not in values]
+            if STATS:
+                incr('cache_hits', len(values))
+                incr('cache_misses', len(missing))
+            if missing:
+                loaded = fetch_translations(model,
+                                            list(set(pk for pk, _ in missing)),
+                                            needed, getattr(self, 'db', None))
+                if STATS:
+                    incr('prefetch_queries')
+                loaded = dict((key, loaded.get(key, NOT_TRANSLATED))
+                                for key in missing)
+                translation_cache.set_many(trans_model, loaded)
+                values.update(loaded)
+        else:
+            values = fetch_translations(model, pks, needed,
+                                        getattr(self, 'db', None))
+            if STATS:
+                incr('prefetch_queries')
+
+        width = trans_opts.join_template.width
+        return [store_values(values, pk, languages, fallbacks, width)
+                    for pk in pks]
+
+    def needed_languages(self, languages, model=None):
+        """ Returns ({language: fallback languages}, needed languages) for
+        `languages` on `model`, needed languages are sorted and include
+        fallback ones """
+        fallbacks = dict((lang, self.get_fallbacks(lang, model))
+                            for lang in languages)
+        needed = set(languages)
+        for chain in fallbacks.itervalues():
+            needed.update(chain)
+        return fallbacks, sorted(needed)
+
+    def joined_values(self, values, model, path=()):
+        """ Pops `model` translation join columns (of `path` select_related
+        model if given) from `values` instance dict, returns joined
+        languages values with the translations store layout, converted to
+        python values. JSON data is decoded (fallbacks included) with json
+        storage. """
+        trans_opts = model._translation_model._transmeta
+        template = trans_opts.join_template
+        columns = tuple([values.pop(name) for name in
+                            template.joined_columns(len(self.joined), path)])
+        if trans_opts.storage != JSON_STORAGE or not columns:
+            if not template.converted:
+                return columns
+            columns = list(columns)
+            for start in range(0, len(columns), template.width):
+                for index, field in template.converted:
+                    columns[start + index] = convert_value(field,
+                                                           columns[start + index])
+            return tuple(columns)
+        fallbacks, needed = self.needed_languages(self.joined, model)
+        decoded = decode_translations(model, [(None,) + columns], needed)
+        return store_values(decoded, None, self.joined, fallbacks,
+                            template.width)
+
+    @timed('change_fields')
+    def change_fields(self, instance, languages=None, loaded=(), related=None):
+        """Here we move joined values from positional columns, plus the
+        `loaded` values for languages not joined, to instance translations
+        store, then overrides the default fields with their translated values
+        using instance switch_language. Master values are kept on the store
+        if fields get overriden (models registered without lazy_fields).
+
+        select_related instances get their translations the same way,
+        `related` holds their loaded values (in self.related order).
+        """
+        if not self.languages: # nothing to translate
+            return instance
+        if STATS:
+            incr('rows_translated')
+
+        if languages is None:
+            languages = self.joined + \
+                        sorted(self.languages.difference(self.joined))
+
+        # joined columns are set straight on instance __dict__ by django
+        values = instance.__dict__
+        for index, (path, model) in enumerate(self.related):
+            translated = self.joined_values(values, model, path)
+            obj = get_related(instance, path)
+            if obj is not None:
+                set_translations(obj, languages,
+                                 translated + (related and related[index] or ()),
+                                 self.lang)
+        translated = self.joined_values(values, self.model)
+        # switch to implicit language
+        return set_translations(instance, languages, translated + loaded,
+                                self.lang)
+
+    def without_translations(self):
+        """ Returns a clone without the translation joins and selected
+        columns, but the ones needed by translated field lookups. Joins are
+        on the unique (master, language) pair, so they don't change the
+        number of rows and count, exists and aggregate can leave them out.
+        """
+        clone = self._clone()
+        query = clone.query
+        query.clear_ordering(True) # may use translated columns
+        positions = [JOIN_ALIAS % self.joined.index(lang)
+                        for lang in self.filtered]
+        keep = lambda alias: [p for p in positions
+                                if alias == p or alias.startswith(p + '_')]
+        query.custom_joins = tuple([join for join in getattr(query, 'custom_joins', ())
+                                        if keep(join.alias)])
+        columns = self.translation_columns()
+        for name in columns:
+            query.extra.pop(name, None)
+        if query.extra_select_mask is not None:
+            query.set_extra_mask(query.extra_select_mask.difference(columns))
+        return clone
+
+    def count(self):
+        """ count override, translation joins are left out if not needed
+        (see without_translations) """
+        if self._result_cache is not None or not self.joined:
+            return super(TransQuerySet, self).count()
+        return super(TransQuerySet, self.without_translations()).count()
+
+    def exists(self):
+        """ exists override, translation joins are left out if not needed
+        (see without_translations) """
+        if self._result_cache is not None or not self.joined:
+            return super(TransQuerySet, self).exists()
+        return super(TransQuerySet, self.without_translations()).exists()
+
+    def aggregate(self, *args, **kwargs):
+        """ aggregate override, translation joins are left out if not
+        needed (see without_translations) """
+        if not self.joined:
+            return super(TransQuerySet, self).aggregate(*args, **kwargs)
+        return super(TransQuerySet, self.without_translations())\
+                    .aggregate(*args, **kwargs)
+
+    def translated_values(self, fields):
+        """ Returns a (query set, fields) tuple for values and values_list.
+        Translatable fields in `fields` (every field if empty) are selected
+        as their implicit language values, fallbacks included and master
+        value if not translated, as extra selects named after the field
+        (converted on results as backends don't convert them). With json
+        storage the JSON data is selected instead and values are decoded on
+        results (see TransValuesQuerySet). """
+        if not fields:
+            joined = self.translation_columns()
+            fields = [f.attname for f in self.model._meta.fields] + \
+                     [name for name in self.query.extra if name not in joined]
+        fields = list(fields)
+        if not self.lang:
+            return self, fields
+
+        trans_opts = self.model._translation_model._transmeta
+        names = [name for name in fields
+                    if name in trans_opts.translatable_fields]
+        clone = names and self.require_join(self.lang) or self
+        if names and trans_opts.storage == JSON_STORAGE:
+            clone = clone._clone()
+            clone.decoded = (JOIN_COLUMN % (JSON_DATA_FIELD_NAME, 0),
+                             self.lang, self.get_fallbacks(self.lang), names)
+            return clone, fields
+        select = SortedDict()
+        for name in names:
+            column = clone.translated_column(name, self.lang)
+            select[name] = AliasedSQL('COALESCE(%s, %s.%s)' % (
+                                getattr(column, 'template', column), LHS,
+                                QN(self.model._meta.get_field(name).column)),
+                            self.model._meta.db_table)
+        if select:
+            clone = clone.extra(select=select)
+            clone.converted = tuple([name for name in names
+                                        if not isinstance(self.model._meta.get_field(name),
+                                                          (CharField, TextField))])
+        return clone, fields
+
+    def hidden_columns(self, fields):
+        """ Extra selected columns used on ordering (django needs them on
+        the select list) but not in `fields` """
+        ordering = [name.lstrip('-') for name in list(self.query.order_by) +
+                                                 list(self.query.extra_order_by)]
+        if self.decoded: # JSON data
+            ordering.append(self.decoded[0])
+        return [name for name in ordering
+                    if name in self.query.extra and name not in fields]
+
+    def values(self, *fields):
+        """ values override, translatable fields values are returned on
+        implicit language (see translated_values). Translated field lookups
+        and ordering must be added before calling values. """
+        clone, fields = self.translated_values(fields)
+        return clone._clone(klass=TransValuesQuerySet, setup=True,
+                            _fields=fields, hidden=clone.hidden_columns(fields),
+                            decoded=clone.decoded, converted=clone.converted)
+
+    def values_list(self, *fields, **kwargs):
+        """ values_list override, translatable fields values are returned
+        on implicit language (see translated_values) """
+        flat = kwargs.pop('flat', False)
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments to values_list: %s'
+                            % (kwargs.keys(),))
+        if flat and len(fields) > 1:
+            raise TypeError("'flat' is not valid when values_list is called "
+                            "with more than one field.")
+        clone, fields = self.translated_values(fields)
+        return clone._clone(klass=TransValuesListQuerySet, setup=True,
+                            flat=flat, _fields=fields,
+                            hidden=clone.hidden_columns(fields),
+                            decoded=clone.decoded, converted=clone.converted)
+
+    def _as_sql(self, *args, **kwargs):
+        """ Subqueries select pk through values (see TransValuesQuerySet) """
+        return self.values('pk')._as_sql(*args, **kwargs)
+
+    def _clone(self, klass=None, setup=False, **kwargs):
         """ _clone override, setups languages requested and current 
         selected language"""
-        clone = super(TransQuerySet, self)._clone()
+        clone = super(TransQuerySet, self)._clone(klass, setup, **kwargs)
         clone.lang = self.lang
-        clone.languages = self.languages
+        clone.loading = self.loading
+        clone.fallbacks = self.fallbacks
+        clone.languages = set(self.languages)
+        clone.joined = self.joined
+        clone.filtered = self.filtered
+        clone.related = self.related
+        clone.prefetched = self.prefetched
         return clone
+
+
+class TransValuesQuerySet(ValuesQuerySet):
+    """ values() query set returned by TransQuerySet. Translated values are
+    selected by the query itself, no instances are built. Columns on
+    `hidden` (ordering columns) are selected but left out of results.
+
+    With json storage `decoded` is a (JSON data column, language, fallback
+    languages, field names) tuple, field values are replaced by the ones
+    decoded from the data column (a hidden one) if translated. Values of
+    `converted` fields are converted to python values (see convert_value).
+    """
+    hidden = ()
+    decoded = None
+    converted = ()
+
+    def _setup_query(self):
+        super(TransValuesQuerySet, self)._setup_query()
+        if self.hidden:
+            self.extra_names = self.extra_names + list(self.hidden)
+            self.query.set_extra_mask(self.extra_names)
+
+    def _clone(self, klass=None, setup=False, **kwargs):
+        kwargs.setdefault('hidden', self.hidden)
+        kwargs.setdefault('decoded', self.decoded)
+        kwargs.setdefault('converted', self.converted)
+        return super(TransValuesQuerySet, self)._clone(klass, setup, **kwargs)
+
+    def _as_sql(self, *args, **kwargs):
+        """ Hidden columns are left out of subqueries, django drops their
+        ordering if they aren't sliced """
+        obj = self
+        if self.hidden and not self.query.low_mark and \
+           self.query.high_mark is None:
+            obj = self._clone()
+            obj.query.clear_ordering(True)
+            obj.query.set_extra_mask([name for name in self.extra_names
+                                        if name not in self.hidden])
+        return super(TransValuesQuerySet, obj)._as_sql(*args, **kwargs)
+
+    def iterator(self):
+        rows = super(TransValuesQuerySet, self).iterator()
+        if not self.hidden and not self.converted:
+            return rows
+        return self.clean_rows(rows)
+
+    def clean_rows(self, rows):
+        """ Yields `rows` with translated values decoded and converted,
+        hidden columns left out """
+        for row in rows:
+            self.decode(row)
+            self.convert(row)
+            for name in self.hidden:
+                del row[name]
+            yield row
+
+    def convert(self, row):
+        """ Converts `converted` fields values on `row` dict """
+        for name in self.converted:
+            row[name] = convert_value(self.model._meta.get_field(name),
+                                      row[name])
+
+    def decode(self, row):
+        """ Replaces translatable fields values on `row` dict by the ones
+        decoded from its JSON data, if any """
+        if not self.decoded:
+            return
+        column, lang, fallbacks, names = self.decoded
+        decoded = decode_translations(self.model, [(None, None, row[column])],
+                                      (lang,) + fallbacks)
+        value = apply_fallbacks(decoded, None, lang, fallbacks)
+        if not value:
+            return
+        fields = self.model._translation_model._transmeta.translatable_fields
+        for name, translated in zip(fields, value[1:]):
+            if name in names and translated is not None:
+                row[name] = translated
+
+
+class TransValuesListQuerySet(TransValuesQuerySet, ValuesListQuerySet):
+    """ values_list() query set returned by TransQuerySet, see
+    TransValuesQuerySet """
+    def iterator(self):
+        if not self.hidden and not self.converted:
+            return ValuesListQuerySet.iterator(self)
+        if MULTIDB_SUPPORT:
+            rows = self.query.get_compiler(self.db).results_iter()
+        else:
+            rows = self.query.results_iter()
+        return self.clean_rows(rows)
+
+    def clean_rows(self, rows):
+        names = self.query.extra_select.keys() + self.field_names + \
+                self.query.aggregate_select.keys()
+        for row in rows:
+            data = dict(zip(names, row))
+            self.decode(data)
+            self.convert(data)
+            if self.flat:
+                yield data[self._fields[0]]
+            else:
+                yield tuple([data[name] for name in self._fields])
@@ -0,0 +1,103 @@
+"""
+Translated queries instrumentation.
+
+Counters are gathered per process when MODEL_I18N_STATS setting is enabled:
+
+    * queries: TransQuerySet iterations
+    * languages_joined, languages_prefetched: languages loaded by those
+      iterations, with join and prefetch loading
+    * prefetch_queries, cache_hits, cache_misses: prefetched translations
+      queries and translation cache lookups
+    * bundle_loads: translation bundles loaded from the database
+    * rows_translated: instances set up with translated values
+    * <name>_calls, <name>_time: calls and total seconds spent on timed
+      operations, query_build (translation joins setup), change_fields,
+      switch_language and change_view (admin i18n_change_view)
+
+Counters are read with get_stats and cleared with reset. flush sends them
+with the stats_collected signal and resets them, useful to forward them to
+a metrics system (from a request_finished handler for example):
+
+    def report(sender, stats, **kwargs):
+        for name, value in stats.iteritems():
+            metrics.gauge('i18n.%s' % name, value)
+    stats_collected.connect(report)
+"""
+import time
+from threading import Lock
+
+from django.dispatch import Signal
+from django.utils.functional import wraps
+
+from model_i18n.conf import STATS
+
+
+TIMED = ('query_build', 'change_fields', 'switch_language', 'change_view')
+COUNTERS = ('queries', 'languages_joined', 'languages_prefetched',
+            'prefetch_queries', 'cache_hits', 'cache_misses',
+            'bundle_loads', 'rows_translated') + \
+           tuple(['%s_%s' % (name, suffix) for name in TIMED
+                                            for suffix in ('calls', 'time')])
+
+stats_collected = Signal(providing_args=['stats'])
+
+_lock = Lock()
+_stats = dict.fromkeys(COUNTERS, 0)
+
+
+def incr(name, value=1):
+    """ Increments `name` counter by `value` """
+    _lock.acquire()
+    try:
+        _stats[name] += value
+    finally:
+        _lock.release()
+
+
+def get_stats():
+    """ Returns a copy of current counters """
+    _lock.acquire()
+    try:
+        return dict(_stats)
+    finally:
+        _lock.release()
+
+
+def reset():
+    """ Sets every counter back to zero, returns previous values """
+    _lock.acquire()
+    try:
+        stats = dict(_stats)
+        _stats.update(dict.fromkeys(COUNTERS, 0))
+        return stats
+    finally:
+        _lock.release()
+
+
+def flush(sender=None):
+    """ Sends stats_collected signal with current counters and resets
+    them """
+    stats_collected.send(sender=sender, stats=reset())
+
+
+def timed(name):
+    """ Decorator, adds calls and time spent on decorated function to
+    <name>_calls and <name>_time counters. Functions are returned as they
+    are if stats are disabled. """
+    def decorator(func):
+        if not STATS:
+            return func
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.time() - start
+                _lock.acquire()
+                try:
+                    _stats['%s_calls' % name] += 1
+                    _stats['%s_time' % name] += elapsed
+                finally:
+                    _lock.release()
+        return wraps(func)(wrapper)
+    return decorator
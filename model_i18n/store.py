@@ -0,0 +1,49 @@
+"""
+Per-instance translations store.
+"""
+
+
+class TranslationStore(object):
+    """ Compact translated values container attached to instances loaded by
+    TransQuerySet.
+
+    Values are kept on a flat tuple with a fixed layout, a block for each
+    language on `languages` (in order) holding the translation pk followed
+    by translatable_fields values (in translatable_fields order):
+
+        values[language position * width + field position]
+
+    `languages` list is shared by every instance loaded by the same
+    queryset. `master` holds master values (in translatable_fields order)
+    when instance attributes are overriden with translated values, it's
+    None otherwise. `current` is the current selected language.
+    """
+    __slots__ = ('languages', 'values', 'width', 'master', 'current')
+
+    def __init__(self, languages, values, width, master=None):
+        self.languages = languages
+        self.values = values
+        self.width = width
+        self.master = master
+        self.current = None
+
+    def __getstate__(self):
+        return tuple([getattr(self, slot) for slot in self.__slots__])
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    def get(self, lang, index):
+        """ Returns value at `index` position for `lang`, None if `lang`
+        wasn't loaded """
+        try:
+            return self.values[self.languages.index(lang) * self.width + index]
+        except ValueError:
+            return None
+
+    def set(self, lang, index, value):
+        """ Replaces value at `index` position for `lang` """
+        position = self.languages.index(lang) * self.width + index
+        self.values = self.values[:position] + (value,) + \
+                      self.values[position + 1:]
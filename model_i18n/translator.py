@@ -3,18 +3,28 @@ import copy
 
 from django.conf import settings
 from django.db import models
+from django.db.models import signals
+from django.core.signals import request_started
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.translation import ugettext_lazy as _
 
 from model_i18n import managers
 from model_i18n.options import ModelTranslation
-from model_i18n.exceptions import AlreadyRegistered
-from model_i18n.conf import CURRENT_LANGUAGES, CURRENT_LANGUAGE, \
-                            ATTR_BACKUP_SUFFIX
+from model_i18n.query import TransJoinTemplate, JsonJoinTemplate, \
+                             load_bundle_language
+from model_i18n.exceptions import AlreadyRegistered, NotRegistered
+from model_i18n.conf import TRANSLATION_VALUES, DEFERRED_SETUP, \
+                            JSON_STORAGE, JSON_DATA_FIELD_NAME, SAVED_LANGUAGE
 from model_i18n.admin import setup_admin
+from model_i18n.cache import translation_cache
+from model_i18n.bundles import translation_bundles
+from model_i18n.descriptors import setup_descriptors
+from model_i18n.stats import timed
+from model_i18n import bulk
 
 
-__all__ = ['register', 'ModelTranslation']
+__all__ = ['register', 'bulk_upsert_translations', 'setup_deferred',
+           'ModelTranslation']
 
 
 class Translator(object):
@@ -27,6 +37,7 @@ class Translator(object):
     """
     def __init__(self):
         self._registry = {} # model_class class -> translation_class instance
+        self._pending = [] # deferred setup, (master_model, translation_class) pairs
 
     def register(self, master_model, translation_class=None, **options):
         """
@@ -48,9 +59,13 @@ class Translator(object):
             translation_class = type('%sTranslation' % master_model.__name__, (translation_class,), options)
 
         # Validate the translation_class (just in debug mode).
-        if settings.DEBUG:
+        if settings.DEBUG and not DEFERRED_SETUP:
             from model_i18n.validation import validate
             validate(translation_class, master_model)
+        # Bundles on per process caches serve stale translations once other
+        # processes write them, checked whatever DEBUG setting is
+        from model_i18n.validation import validate_bundle
+        validate_bundle(translation_class, master_model)
 
         opts = translation_class(master_model)
 
@@ -58,22 +73,69 @@ class Translator(object):
         translation_model = self.create_translation_model(master_model, opts)
         models.register_models(master_model._meta.app_label, translation_model)
         self.setup_master_model(master_model, translation_model) # This probably will become a class method soon.
-        setup_admin(master_model, translation_model) # Setup django-admin support
+        if opts.cache: # Drop cached values when translations change
+            translation_cache.connect(translation_model)
+        if opts.bundle: # Reload bundles when translations change
+            translation_bundles.connect(translation_model)
 
         # Register the multilingual model and the used translation_class.
         self._registry[master_model] = opts
 
+        if opts.storage == JSON_STORAGE:
+            JoinTemplate = JsonJoinTemplate
+        else:
+            JoinTemplate = TransJoinTemplate
+        if DEFERRED_SETUP:
+            # Join SQL fragments get compiled on first use
+            translation_model._transmeta.join_template = \
+                    JoinTemplate(master_model)
+            self._pending.append((master_model, translation_class))
+            request_started.connect(self.setup_deferred,
+                                    dispatch_uid='model_i18n.setup_deferred')
+        else:
+            # Compile translation join SQL fragments
+            translation_model._transmeta.join_template = \
+                    JoinTemplate(master_model, len(settings.LANGUAGES))
+            setup_admin(master_model, translation_model) # Setup django-admin support
+
+    def setup_deferred(self, *args, **kwargs):
+        """
+        Runs registration steps deferred by MODEL_I18N_DEFERRED_SETUP setting
+        for models registered since last call: translation_class validation
+        (just in debug mode) and django-admin support. Called on first
+        request (request_started signal), call it directly if admin or
+        validation are needed before.
+        """
+        while self._pending:
+            master_model, translation_class = self._pending.pop(0)
+            if settings.DEBUG:
+                from model_i18n.validation import validate
+                validate(translation_class, master_model)
+            setup_admin(master_model, master_model._translation_model)
+
+    def bulk_upsert(self, master_model, rows, chunk_size=None):
+        """ Inserts or updates `master_model` translations in bulk (see
+        bulk.bulk_upsert) """
+        if master_model not in self._registry:
+            raise NotRegistered('The model "%s" is not registered for translation' % master_model.__name__)
+        return bulk.bulk_upsert(master_model, rows, chunk_size)
+
 
     def create_translation_model(self, master_model, opts):
         """
         Creates a model for storing `master_model`'s translations based on
-        given registration options class.
+        given registration options class. With json storage the model holds
+        a row per master instance, every language values on a JSON field.
         """
         attrs = {'__module__': master_model.__module__}
 
         class Meta:
             app_label = master_model._meta.app_label
             db_table = opts.db_table
+            if opts.storage != JSON_STORAGE:
+                # translation joins filter on (master, language)
+                unique_together = ((opts.master_field_name,
+                                    opts.language_field_name),)
         attrs['Meta'] = Meta
 
         class TranslationMeta:
@@ -83,8 +145,30 @@ class Translator(object):
             language_field_name = opts.language_field_name
             master_field_name = opts.master_field_name
             related_name = opts.related_name
+            fallbacks = opts.fallbacks or {}
+            loading = opts.loading
+            cache = opts.cache
+            bundle = opts.bundle
+            lazy_fields = opts.lazy_fields
+            covering_index = opts.covering_index
+            admin_languages_column = opts.admin_languages_column
+            storage = opts.storage
         attrs['_transmeta'] = TranslationMeta
 
+        model_name = master_model.__name__ + 'Translation'
+        # setup i18n languages on master model for easier access
+        master_model.i18n_languages = settings.LANGUAGES
+        master_model.i18n_default_language = opts.master_language
+
+        if opts.storage == JSON_STORAGE:
+            # a row per master instance, values on a JSON object
+            attrs[opts.master_field_name] = models.ForeignKey(master_model,
+                verbose_name=_('master'), related_name=opts.related_name,
+                unique=True)
+            attrs[JSON_DATA_FIELD_NAME] = models.TextField(_('translations'),
+                                                           default='{}')
+            return type(model_name, (models.Model,), attrs)
+
         # Common translation model fields
         common_fields = {
             # Translation language
@@ -98,7 +182,6 @@ class Translator(object):
         attrs.update(common_fields)
 
         # Add translatable fields
-        model_name = master_model.__name__ + 'Translation'
         for field in master_model._meta.fields:
             if field.name not in opts.fields:
                 continue
@@ -110,12 +193,10 @@ class Translator(object):
                     % (model_name, master_model.__name__, field.attname))
             newfield = copy.copy(field)
             newfield.primary_key = False
-            newfield._unique = False # FIXME (unique_together)
+            newfield._unique = False # a value per language
+            newfield.null = True # null means not translated
 
             attrs[newfield.name] = newfield
-        # setup i18n languages on master model for easier access
-        master_model.i18n_languages = settings.LANGUAGES
-        master_model.i18n_default_language = opts.master_language
         return type(model_name, (models.Model,), attrs)
 
     def setup_master_model(self, master_model, translation_model):
@@ -125,6 +206,7 @@ class Translator(object):
         Master model:
             * master_model._translation_model: Translation model
             * master_model.switch_language: language switcher
+            * translations descriptors (see descriptors module)
 
         Managers:
             * See setup_manager
@@ -132,6 +214,16 @@ class Translator(object):
         # Master model
         master_model._translation_model = translation_model
         master_model.switch_language = switch_language
+        # Translated values shown on fields aren't saved as master values
+        uid = '%s.%s' % (master_model._meta.app_label, master_model.__name__)
+        signals.pre_save.connect(save_master_values, sender=master_model,
+                                 dispatch_uid='model_i18n.save_master_values.%s' % uid)
+        signals.post_save.connect(restore_translated_values, sender=master_model,
+                                  dispatch_uid='model_i18n.restore_translated_values.%s' % uid)
+        master_language = translation_model._transmeta.master_language
+        languages = [code for code, name in settings.LANGUAGES
+                        if code != master_language]
+        setup_descriptors(master_model, translation_model, languages)
         # Managers
         # FIXME: We probably should we add a translation option to ignore some
         # manager (so users can create non multilingual managers)
@@ -143,16 +235,23 @@ class Translator(object):
         """
         Patch for master model's managers.
             * model.objects.set_language: Sets the current language.
-            * model.objects.get_query_set: All querysets are TransQuerySet types
+            * model.objects.set_loading: Sets translations loading strategy.
+            * model.objects.prefetch_related: Prefetches related objects.
+            * model.objects.get_query_set: All querysets are TransQuerySet types,
+              with the default language applied
+            * model.objects.get_master_query_set: TransQuerySet without the
+              default language
         """
         # Backup get_query_set to use in translation get_query_set
         manager.get_query_set_orig = manager.get_query_set
-        for method_name in ('get_query_set', 'set_language'):
+        for method_name in ('get_query_set', 'get_master_query_set',
+                            'set_language', 'set_loading', 'prefetch_related'):
             # Add translation method into the manager instance
             setattr(manager, method_name,
                 new.instancemethod(getattr(managers, method_name), manager, manager.__class__))
 
 
+@timed('switch_language')
 def switch_language(instance, lang=None):
     """Here we overrides the default fields with their translated
     values. We keep the default if there's no value in the translated
@@ -161,24 +260,86 @@ def switch_language(instance, lang=None):
             will load attribute values for 'es' language
         instance.switch_language()
             will load attribute values for master default language
+    Values are taken from the instance translations store. Models
+    registered with lazy_fields option just change the current language,
+    translatable fields descriptors resolve the values. Languages not
+    loaded are taken from the model bundles on models registered with the
+    bundle option.
     """
-    current_languages = getattr(instance, CURRENT_LANGUAGES, None)
-    current = getattr(instance, CURRENT_LANGUAGE, None)
+    store = instance.__dict__.get(TRANSLATION_VALUES)
+    trans_meta = instance._translation_model._transmeta
+    if lang and trans_meta.bundle and lang != trans_meta.master_language and \
+       (store is None or lang not in store.languages):
+        store = load_bundle_language(instance, lang)
 
-    if current_languages: # any translation?
-        trans_meta = instance._translation_model._transmeta
+    if store is not None and store.languages: # any translation?
         fields = trans_meta.translatable_fields
-        if not lang or lang == trans_meta.master_language: # use defaults
-            for name in fields:
-                value = getattr(instance, '_'.join((name, ATTR_BACKUP_SUFFIX)),
-                                None)
+        if trans_meta.lazy_fields: # descriptors resolve current language
+            pass
+        elif not lang or lang == trans_meta.master_language: # use defaults
+            for name, value in zip(fields, store.master):
+                setattr(instance, name, value)
+        elif lang in store.languages and lang != store.current: # swtich language
+            for index, name in enumerate(fields):
+                value = store.get(lang, index + 1)
+                if value is None: # None means not translated
+                    value = store.master[index]
                 setattr(instance, name, value)
-        elif lang in current_languages and lang != current: # swtich language
-            for name in fields:
-                value = getattr(instance, '_'.join((name, lang)), None)
-                if value is not None: # Ignore None, means not translated
-                    setattr(instance, name, value)
-        setattr(instance, CURRENT_LANGUAGE, lang)
+        store.current = lang
+
+
+def get_switched_store(instance):
+    """ Returns `instance` translations store if its fields show a
+    translated language values (see switch_language), None otherwise """
+    store = instance.__dict__.get(TRANSLATION_VALUES)
+    trans_meta = instance._translation_model._transmeta
+    if store is None or not store.current or \
+       store.current == trans_meta.master_language:
+        return None
+    return store
+
+
+def save_master_values(sender, instance, **kwargs):
+    """ pre_save handler for master models. Fields still holding the
+    translated value shown by switch_language get their master value back
+    so translations aren't saved over master values, fields assigned since
+    are saved (and kept on the store) as new master values. Instances of
+    models registered with lazy_fields get no language selected while
+    saved, so descriptors return master values. """
+    store = get_switched_store(instance)
+    if store is None:
+        return
+    if instance._translation_model._transmeta.lazy_fields:
+        # descriptors show master values while no language is selected,
+        # assignments were kept as translated values
+        instance.__dict__[SAVED_LANGUAGE] = store.current
+        store.current = None
+        return
+    master = list(store.master)
+    for index, name in enumerate(instance._translation_model._transmeta\
+                                         .translatable_fields):
+        shown = store.get(store.current, index + 1)
+        if shown is None: # not translated, master value was shown
+            shown = master[index]
+        value = getattr(instance, name)
+        if value == shown:
+            setattr(instance, name, master[index])
+        else:
+            master[index] = value
+    store.master = tuple(master)
+
+
+def restore_translated_values(sender, instance, **kwargs):
+    """ post_save handler for master models, fields get the current
+    language values back once saved (see save_master_values) """
+    language = instance.__dict__.pop(SAVED_LANGUAGE, None)
+    if language is not None: # lazy_fields
+        instance.__dict__[TRANSLATION_VALUES].current = language
+        return
+    store = get_switched_store(instance)
+    if store is not None:
+        language, store.current = store.current, None
+        instance.switch_language(language)
 
 
 # Just one Translator instance is needed.
@@ -189,3 +350,21 @@ _translator = Translator()
 def register(model, translation_class=None, **options):
     """ Register and set up `model` as a multilingual model. """
     return _translator.register(model, translation_class, **options)
+
+
+def get_registered_models():
+    """ Returns registered multilingual models """
+    return _translator._registry.keys()
+
+
+def bulk_upsert_translations(model, rows, chunk_size=None):
+    """ Inserts or updates `model` translations from `rows`, an iterable
+    of (master pk, language, {field name: value}) tuples, by chunks of
+    `chunk_size` rows. Returns (created, updated) counts. """
+    return _translator.bulk_upsert(model, rows, chunk_size)
+
+
+def setup_deferred():
+    """ Runs registration steps deferred by MODEL_I18N_DEFERRED_SETUP
+    setting (see Translator.setup_deferred) """
+    _translator.setup_deferred()
@@ -1,6 +1,12 @@
 from django.db import models
 from django.core.exceptions import ImproperlyConfigured
 
+from model_i18n.conf import JOIN_LOADING, LOADING_STRATEGIES, ROWS_STORAGE, \
+                            JSON_STORAGE, STORAGES, CACHE_BACKEND
+
+# Cache backends not shared by processes
+PROCESS_CACHE_BACKENDS = ('locmem', 'dummy')
+
 # Helpers
 
 def check_isseq(cls, label, obj):
@@ -32,6 +38,57 @@ def validate_fields(cls, model):
         raise ImproperlyConfigured('%s.fields is a is a required attribute.' % cls.__name__)
 
 
+def validate_fallbacks(cls, model):
+    """ Validates fallback languages """
+    fallbacks = getattr(cls, 'fallbacks', None)
+    if fallbacks is None:
+        return
+    if not isinstance(fallbacks, dict):
+        raise ImproperlyConfigured('"%s.fallbacks" must be a dictionary.' % cls.__name__)
+    for language, languages in fallbacks.iteritems():
+        check_isseq(cls, 'fallbacks[%r]' % language, languages)
+
+
+def validate_covering_index(cls, model):
+    """ Validates covering index fields """
+    covering = getattr(cls, 'covering_index', False)
+    if covering and covering is not True:
+        check_isseq(cls, 'covering_index', covering)
+        for field in covering:
+            if field not in cls.fields:
+                raise ImproperlyConfigured('"%s.covering_index" refers to field "%s" that is not translatable.'
+                                           % (cls.__name__, field))
+
+
+def validate_loading(cls, model):
+    """ Validates translations loading strategy """
+    if getattr(cls, 'loading', JOIN_LOADING) not in LOADING_STRATEGIES:
+        raise ImproperlyConfigured('%s.loading must be one of %s.'
+                                   % (cls.__name__, ', '.join(LOADING_STRATEGIES)))
+
+
+def validate_storage(cls, model):
+    """ Validates translations storage """
+    storage = getattr(cls, 'storage', ROWS_STORAGE)
+    if storage not in STORAGES:
+        raise ImproperlyConfigured('%s.storage must be one of %s.'
+                                   % (cls.__name__, ', '.join(STORAGES)))
+    if storage == JSON_STORAGE and getattr(cls, 'covering_index', False):
+        raise ImproperlyConfigured('%s.covering_index needs rows storage.'
+                                   % cls.__name__)
+
+
+def validate_bundle(cls, model):
+    """ Validates bundles are shared by every process, called on every
+    registration (not just in debug mode) """
+    scheme = CACHE_BACKEND.split(':', 1)[0]
+    if getattr(cls, 'bundle', False) and scheme in PROCESS_CACHE_BACKENDS:
+        raise ImproperlyConfigured('%s.bundle needs a cache backend shared by '
+                                   'every process on MODEL_I18N_CACHE_BACKEND '
+                                   'setting, "%s" caches are per process.'
+                                   % (cls.__name__, scheme))
+
+
 # Global validator
 
 def validate(cls, model):
@@ -42,3 +99,7 @@ def validate(cls, model):
 
     # Call each option validation
     validate_fields(cls, model)
+    validate_fallbacks(cls, model)
+    validate_loading(cls, model)
+    validate_storage(cls, model)
+    validate_covering_index(cls, model)
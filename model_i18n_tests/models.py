@@ -0,0 +1,39 @@
+"""
+Models used by model_i18n tests, registered for translation on the
+translations module.
+"""
+from django.db import models
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=50)
+
+    def __unicode__(self):
+        return self.name
+
+
+class Article(models.Model):
+    category = models.ForeignKey(Category, null=True, related_name='articles')
+    title = models.CharField(max_length=100)
+    price = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+    published = models.DateField(null=True)
+    rank = models.IntegerField(default=0)
+
+    def __unicode__(self):
+        return self.title
+
+
+class LazyArticle(models.Model):
+    title = models.CharField(max_length=100)
+    rank = models.IntegerField(default=0)
+
+    def __unicode__(self):
+        return self.title
+
+
+class Note(models.Model):
+    title = models.CharField(max_length=100)
+    rank = models.IntegerField(default=0)
+
+    def __unicode__(self):
+        return self.title
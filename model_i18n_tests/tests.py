@@ -0,0 +1,359 @@
+from __future__ import with_statement
+
+from datetime import date
+from decimal import Decimal
+from StringIO import StringIO
+
+from django.db.models import Q
+from django.test import TestCase
+
+from model_i18n.translator import bulk_upsert_translations
+from model_i18n.exchange import export_translations, import_translations
+
+from model_i18n_tests.models import Category, Article, LazyArticle, Note
+
+
+class TranslationTestCase(TestCase):
+    """ Base test case, a few articles with spanish and french
+    translations """
+    def setUp(self):
+        self.category = Category.objects.create(name='Books')
+        self.first = Article.objects.create(category=self.category,
+                                            title='First', rank=1,
+                                            price=Decimal('10.50'),
+                                            published=date(2021, 1, 1))
+        self.second = Article.objects.create(category=self.category,
+                                             title='Second', rank=2,
+                                             price=Decimal('20.00'),
+                                             published=date(2021, 1, 2))
+        self.third = Article.objects.create(title='Third', rank=3)
+        bulk_upsert_translations(Category, [
+            (self.category.pk, 'es', {'name': 'Libros'}),
+            (self.category.pk, 'fr', {'name': 'Livres'})])
+        bulk_upsert_translations(Article, [
+            (self.first.pk, 'es', {'title': 'Primero',
+                                   'price': Decimal('11.25'),
+                                   'published': date(2021, 2, 2)}),
+            (self.first.pk, 'fr', {'title': 'Premier'}),
+            (self.second.pk, 'fr', {'title': 'Deuxieme'})])
+
+    def master_titles(self):
+        return list(Article.objects.get_master_query_set().order_by('pk')\
+                                   .values_list('title', flat=True))
+
+
+class BulkUpsertTest(TranslationTestCase):
+    def test_created_and_updated(self):
+        created, updated = bulk_upsert_translations(Article, [
+            (self.first.pk, 'es', {'title': 'Uno'}),
+            (self.second.pk, 'es', {'title': 'Dos'}),
+            (self.third.pk, 'es', {'title': 'Tres'})])
+        self.assertEqual((created, updated), (2, 1))
+        titles = Article.objects.set_language('es').order_by('pk')\
+                                .values_list('title', flat=True)
+        self.assertEqual(list(titles), [u'Uno', u'Dos', u'Tres'])
+        self.assertEqual(self.master_titles(),
+                         [u'First', u'Second', u'Third'])
+
+    def test_updates_keep_other_fields(self):
+        bulk_upsert_translations(Article, [(self.first.pk, 'es',
+                                            {'title': 'Uno'})])
+        article = Article.objects.set_language('es').get(pk=self.first.pk)
+        self.assertEqual(article.title, u'Uno')
+        self.assertEqual(article.price, Decimal('11.25'))
+        self.assertEqual(article.published, date(2021, 2, 2))
+
+    def test_missing_fields_are_not_translated(self):
+        article = Article.objects.set_language('fr').get(pk=self.first.pk)
+        self.assertEqual(article.title, u'Premier')
+        self.assertEqual(article.price_fr, None)
+        self.assertEqual(article.price, Decimal('10.50'))
+
+    def test_invalid_rows(self):
+        from django.core.exceptions import FieldError
+        self.assertRaises(FieldError, bulk_upsert_translations, Article,
+                          [(self.first.pk, 'es', {'rank': 5})])
+        self.assertRaises(ValueError, bulk_upsert_translations, Article,
+                          [(self.first.pk, 'de', {'title': 'Erste'})])
+
+
+class NotNullColumnsTest(TranslationTestCase):
+    def setUp(self):
+        from model_i18n import bulk
+        super(NotNullColumnsTest, self).setUp()
+        self.bulk = bulk
+
+    def tearDown(self):
+        from model_i18n.indexes import get_not_null_fields
+        self.bulk.get_not_null_fields = get_not_null_fields
+
+    def test_translated_columns_allow_null(self):
+        from model_i18n.indexes import get_not_null_fields
+        self.assertEqual(get_not_null_fields(Article), [])
+
+    def test_missing_fields_on_not_null_columns(self):
+        import warnings
+        from model_i18n.exceptions import OptionWarning
+        title = Article._translation_model._meta.get_field('title')
+        self.bulk.get_not_null_fields = lambda model: [title]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            bulk_upsert_translations(Article, [(self.third.pk, 'es',
+                                                {'price': Decimal('1.00')})])
+        self.assertEqual([w.category for w in caught], [OptionWarning])
+        translation = Article._translation_model.objects.get(
+                                _master=self.third.pk, _language='es')
+        self.assertEqual((translation.title, translation.price),
+                         (u'', Decimal('1.00')))
+
+
+class ExchangeTest(TranslationTestCase):
+    def export(self, languages, format):
+        stream = StringIO()
+        export_translations(Article, languages, stream, format)
+        Article._translation_model.objects.all().delete()
+        return StringIO(stream.getvalue())
+
+    def translated(self, language):
+        return [(a.title, a.price, a.published) for a in
+                    Article.objects.set_language(language).order_by('pk')]
+
+    def test_po_round_trip(self):
+        expected = self.translated('es')
+        stream = self.export(['es'], 'po')
+        self.assertEqual(self.translated('es')[0][0], u'First')
+        created, updated = import_translations(Article, stream, 'po')
+        self.assertEqual((created, updated), (1, 0))
+        self.assertEqual(self.translated('es'), expected)
+
+    def test_jsonl_round_trip(self):
+        expected = [self.translated('es'), self.translated('fr')]
+        stream = self.export(['es', 'fr'], 'jsonl')
+        created, updated = import_translations(Article, stream)
+        self.assertEqual((created, updated), (3, 0))
+        self.assertEqual([self.translated('es'), self.translated('fr')],
+                         expected)
+
+
+class SaveTest(TranslationTestCase):
+    def setUp(self):
+        super(SaveTest, self).setUp()
+        self.lazy = LazyArticle.objects.create(title='Lazy')
+        self.note = Note.objects.create(title='Note')
+        bulk_upsert_translations(LazyArticle, [(self.lazy.pk, 'es',
+                                                {'title': 'Perezoso'})])
+        bulk_upsert_translations(Note, [(self.note.pk, 'es',
+                                         {'title': 'Nota'})])
+
+    def assertSavesMaster(self, model, pk, master, translated):
+        obj = model.objects.set_language('es').get(pk=pk)
+        self.assertEqual(obj.title, translated)
+        obj.rank = 5
+        obj.save()
+        self.assertEqual(obj.title, translated)
+        saved = model.objects.get_master_query_set().get(pk=pk)
+        self.assertEqual((saved.title, saved.rank), (master, 5))
+        self.assertEqual(model.objects.set_language('es').get(pk=pk).title,
+                         translated)
+
+    def test_save_keeps_master_values(self):
+        self.assertSavesMaster(Article, self.first.pk, u'First', u'Primero')
+
+    def test_lazy_fields_save_keeps_master_values(self):
+        self.assertSavesMaster(LazyArticle, self.lazy.pk, u'Lazy',
+                               u'Perezoso')
+
+    def test_json_lazy_fields_save_keeps_master_values(self):
+        self.assertSavesMaster(Note, self.note.pk, u'Note', u'Nota')
+
+    def test_assigned_values_are_saved(self):
+        article = Article.objects.set_language('es').get(pk=self.first.pk)
+        article.title = 'New'
+        article.save()
+        self.assertEqual(self.master_titles()[0], u'New')
+
+
+class FallbacksTest(TranslationTestCase):
+    def test_converted_values(self):
+        articles = Article.objects.set_language('fr', fallbacks=['es'])\
+                                  .order_by('pk')
+        self.assertEqual([(a.title, a.price, a.published) for a in articles],
+                         [(u'Premier', Decimal('11.25'), date(2021, 2, 2)),
+                          (u'Deuxieme', Decimal('20.00'), date(2021, 1, 2)),
+                          (u'Third', None, None)])
+
+    def test_subquery(self):
+        categories = Category.objects.set_language('es', fallbacks=['fr'])\
+                                     .order_by('name__lang_es')
+        articles = Article.objects.filter(category__in=categories)
+        self.assertEqual(articles.count(), 2)
+        categories = Category.objects.set_language('es', fallbacks=['fr'])\
+                                     .filter(name__lang_es='Libros')
+        articles = Article.objects.filter(category__in=categories)
+        self.assertEqual(articles.count(), 2)
+        categories = Category.objects.set_language('es', fallbacks=['fr'])\
+                                     .filter(name__lang_es='Books')
+        articles = Article.objects.filter(category__in=categories)
+        self.assertEqual(articles.count(), 0)
+
+
+class ValuesTest(TranslationTestCase):
+    def test_values(self):
+        values = Article.objects.set_language('es').order_by('pk')\
+                                .values('title', 'price', 'published')
+        self.assertEqual(list(values), [
+            {'title': u'Primero', 'price': Decimal('11.25'),
+             'published': date(2021, 2, 2)},
+            {'title': u'Second', 'price': Decimal('20.00'),
+             'published': date(2021, 1, 2)},
+            {'title': u'Third', 'price': None, 'published': None}])
+
+    def test_values_list(self):
+        values = Article.objects.set_language('fr', fallbacks=['es'])\
+                                .order_by('pk').values_list('price', flat=True)
+        self.assertEqual(list(values), [Decimal('11.25'), Decimal('20.00'),
+                                        None])
+        self.assertEqual(type(values[0]), Decimal)
+
+    def test_subquery(self):
+        titles = Article.objects.set_language('es').values('title')
+        articles = Article.objects.filter(title__in=titles)
+        self.assertEqual(sorted([a.pk for a in articles]),
+                         [self.second.pk, self.third.pk])
+        titles = Article.objects.set_language('es').values_list('title')
+        articles = Article.objects.exclude(title__in=titles)
+        self.assertEqual([a.pk for a in articles], [self.first.pk])
+
+
+class QLookupTest(TranslationTestCase):
+    def pks(self, articles):
+        return sorted([a.pk for a in articles])
+
+    def test_filter(self):
+        articles = Article.objects.filter(Q(title__lang_es='Primero') |
+                                          Q(title__lang_fr='Deuxieme'))
+        self.assertEqual(self.pks(articles), [self.first.pk, self.second.pk])
+        articles = Article.objects.filter(Q(title__lang_fr='Deuxieme') |
+                                          Q(rank=3))
+        self.assertEqual(self.pks(articles), [self.second.pk, self.third.pk])
+        articles = Article.objects.filter(~Q(title__lang_fr='Premier'),
+                                          rank__lt=3)
+        self.assertEqual(self.pks(articles), [self.second.pk])
+
+    def test_exclude_keeps_untranslated(self):
+        articles = Article.objects.exclude(title__lang_es='Primero')
+        self.assertEqual(self.pks(articles), [self.second.pk, self.third.pk])
+        articles = Article.objects.exclude(Q(title__lang_fr='Premier') |
+                                           Q(title__lang_fr='Deuxieme'))
+        self.assertEqual(self.pks(articles), [self.third.pk])
+        articles = Article.objects.exclude(title__lang_fr='Premier', rank=2)
+        self.assertEqual(len(articles), 3)
+
+    def test_complex_filter(self):
+        articles = Article.objects.complex_filter(Q(title__lang_es='Primero'))
+        self.assertEqual(self.pks(articles), [self.first.pk])
+
+
+def unsupported_backend(model, cursor=None):
+    raise NotImplementedError('Indexes introspection is not supported')
+
+
+class IndexesTest(TranslationTestCase):
+    def setUp(self):
+        from model_i18n import management
+        from model_i18n.management.commands import i18n_indexes
+        super(IndexesTest, self).setUp()
+        self.modules = (management, i18n_indexes)
+        for module in self.modules:
+            module.get_missing_indexes = unsupported_backend
+        Category._translation_model._transmeta.covering_index = True
+
+    def tearDown(self):
+        from model_i18n.indexes import get_missing_indexes
+        for module in self.modules:
+            module.get_missing_indexes = get_missing_indexes
+        Category._translation_model._transmeta.covering_index = False
+
+    def test_syncdb_warns_on_unsupported_backend(self):
+        import warnings
+        from model_i18n.exceptions import OptionWarning
+        from model_i18n.management import create_covering_indexes
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            create_covering_indexes(None, [Category._translation_model])
+        self.assertEqual([w.category for w in caught], [OptionWarning])
+
+    def test_command_fails_on_unsupported_backend(self):
+        from django.core.management.base import CommandError
+        from model_i18n.management.commands.i18n_indexes import Command
+        self.assertRaises(CommandError, Command().handle)
+
+
+class DefaultLanguageTest(TranslationTestCase):
+    def setUp(self):
+        from django.utils import translation
+        super(DefaultLanguageTest, self).setUp()
+        translation.activate('es')
+
+    def tearDown(self):
+        from django.utils import translation
+        from model_i18n.managers import reset_default_language
+        Article._translation_model._transmeta.default_language = 'master'
+        translation.deactivate()
+        reset_default_language()
+
+    def titles(self, query_set):
+        return list(query_set.order_by('pk').values_list('title', flat=True))
+
+    def test_master_values_by_default(self):
+        self.assertEqual(self.titles(Article.objects.all()),
+                         [u'First', u'Second', u'Third'])
+        self.assertEqual(self.titles(self.category.articles.all()),
+                         [u'First', u'Second'])
+
+    def test_active_language(self):
+        Article._translation_model._transmeta.default_language = 'active'
+        self.assertEqual(self.titles(Article._default_manager.all()),
+                         [u'Primero', u'Second', u'Third'])
+        self.assertEqual(self.titles(Article.objects.get_master_query_set()),
+                         [u'First', u'Second', u'Third'])
+
+
+class BundleTest(TestCase):
+    def setUp(self):
+        from model_i18n import validation
+        self.validation = validation
+        self.cache_backend = validation.CACHE_BACKEND
+        validation.CACHE_BACKEND = 'locmem://'
+
+    def tearDown(self):
+        self.validation.CACHE_BACKEND = self.cache_backend
+
+    def test_process_cache_without_debug(self):
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+        from django.db import models
+        from model_i18n import translator
+
+        class Page(models.Model):
+            title = models.CharField(max_length=100)
+
+            class Meta:
+                app_label = 'model_i18n_tests'
+
+        debug, settings.DEBUG = settings.DEBUG, False
+        try:
+            self.assertRaises(ImproperlyConfigured, translator.register, Page,
+                              fields=('title',), bundle=True)
+        finally:
+            settings.DEBUG = debug
+
+
+class PickleTest(TranslationTestCase):
+    def test_pickled_query_sets(self):
+        import pickle
+        articles = Article.objects.set_language('fr', fallbacks=['es'])\
+                                  .filter(title__lang_fr='Premier')
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            loaded = pickle.loads(pickle.dumps(articles, protocol))
+            self.assertEqual([a.price for a in loaded], [Decimal('11.25')])
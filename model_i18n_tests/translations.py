@@ -0,0 +1,28 @@
+from model_i18n import translator
+
+from model_i18n_tests.models import Category, Article, LazyArticle, Note
+
+
+class CategoryTranslation(translator.ModelTranslation):
+    fields = ('name',)
+
+
+class ArticleTranslation(translator.ModelTranslation):
+    fields = ('title', 'price', 'published')
+
+
+class LazyArticleTranslation(translator.ModelTranslation):
+    fields = ('title',)
+    lazy_fields = True
+
+
+class NoteTranslation(translator.ModelTranslation):
+    fields = ('title',)
+    lazy_fields = True
+    storage = 'json'
+
+
+translator.register(Category, CategoryTranslation)
+translator.register(Article, ArticleTranslation)
+translator.register(LazyArticle, LazyArticleTranslation)
+translator.register(Note, NoteTranslation)
@@ -24,6 +24,7 @@ INSTALLED_APPS = (
     'django.contrib.admin',
     'model_i18n',
     'app',
+    'model_i18n_tests',
 )
 
 MIDDLEWARE_CLASSES = (